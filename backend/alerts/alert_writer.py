@@ -0,0 +1,215 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# Monthly data points are stamped on the 1st and only arrive after the month
+# ends, so a newly detected peak is normally 1-2 months old. Anything older
+# when first detected comes from historical (backfilled) data.
+BACKFILL_AGE = timedelta(days=62)
+
+
+def _naive_utc(timestamp):
+    """Alert timestamps are stored as naive UTC DATETIMEs."""
+    if getattr(timestamp, "tzinfo", None) is not None:
+        return timestamp.replace(tzinfo=None)
+    return timestamp
+
+
+def is_backfill_peak(timestamp, recorded_at):
+    """True if a peak was already older than BACKFILL_AGE when it was first detected."""
+    return _naive_utc(timestamp) < _naive_utc(recorded_at) - BACKFILL_AGE
+
+
+def _key_in_clause(count):
+    """Build a (project, timestamp) IN (...) clause for count keys."""
+    placeholders = ", ".join(["(%s, %s)"] * count)
+    return f"(project, timestamp) IN ({placeholders})"
+
+
+class AlertWriter:
+    """
+    Buffers the peaks computed for one alerts table and applies them in a
+    single transaction with multi-row upserts.
+
+    Rows are (project, timestamp, value, rolling_mean, threshold, percentage_difference)
+    tuples, where value is written to value_column (edit_count / editor_count).
+
+    Peaks that did not exist before are also appended to the peak_events
+    change feed in the same transaction, for the notification job to consume.
+    Those already older than BACKFILL_AGE are flagged is_backfill.
+
+    Stored peaks of an analyzed project that were not recomputed are reconciled
+    in the same transaction: unlabeled ones are deleted, labeled ones are
+    flagged with is_stale so their label survives. The per-project row of
+    peak_summary for metric ('edit' / 'editor') is refreshed as well.
+    """
+
+    def __init__(self, conn, table, value_column, metric, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.table = table
+        self.value_column = value_column
+        self.metric = metric
+        self.batch_size = batch_size
+        self.rows = []
+        self.projects = {}
+
+    def add_peaks(self, project, rows, last_month=None):
+        """
+        Stage the peaks computed for a project (an empty list marks all its stored peaks stale).
+        last_month is an optional (timestamp, value) tuple for the latest month of source data.
+        """
+        if last_month is not None:
+            last_month = (_naive_utc(last_month[0]), last_month[1])
+        self.projects[project] = last_month
+        for row in rows:
+            self.rows.append((project, _naive_utc(row[1])) + tuple(row[2:]))
+
+    def get_existing_peaks(self, cursor):
+        """Return {(project, timestamp): (has_label, is_stale)} for the stored peaks."""
+        cursor.execute(f"SELECT project, timestamp, label, is_stale FROM {self.table}")
+        return {
+            (row[0], row[1]): (bool(row[2]), bool(row[3]))
+            for row in cursor.fetchall()
+        }
+
+    def reconcile(self, cursor, existing):
+        """
+        Delete or flag stored peaks of the analyzed projects that are no longer
+        detected. Returns (deleted, flagged) counts.
+        """
+        fresh = {(row[0], row[1]) for row in self.rows}
+        to_delete = []
+        to_flag = []
+
+        for key, (has_label, is_stale) in existing.items():
+            if key[0] not in self.projects or key in fresh:
+                continue
+            if not has_label:
+                to_delete.append(key)
+            elif not is_stale:
+                to_flag.append(key)
+
+        for start in range(0, len(to_delete), self.batch_size):
+            batch = to_delete[start:start + self.batch_size]
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE {_key_in_clause(len(batch))}",
+                [value for key in batch for value in key]
+            )
+
+        for start in range(0, len(to_flag), self.batch_size):
+            batch = to_flag[start:start + self.batch_size]
+            cursor.execute(
+                f"UPDATE {self.table} SET is_stale = TRUE WHERE {_key_in_clause(len(batch))}",
+                [value for key in batch for value in key]
+            )
+
+        return len(to_delete), len(to_flag)
+
+    def refresh_summary(self, cursor):
+        """Upsert the peak_summary rows of the analyzed projects from the fresh peaks."""
+        peaks_by_project = {}
+        for row in self.rows:
+            peaks_by_project.setdefault(row[0], []).append(row)
+
+        summary_rows = []
+        for project, last_month in self.projects.items():
+            peaks = peaks_by_project.get(project, [])
+            latest = max(peaks, key=lambda row: row[1]) if peaks else None
+            summary_rows.append((
+                project,
+                self.metric,
+                latest[1] if latest else None,
+                latest[2] if latest else None,
+                len(peaks),
+                max(row[5] for row in peaks) if peaks else None,
+                last_month[0] if last_month else None,
+                last_month[1] if last_month else None
+            ))
+
+        summary_sql = """
+            INSERT INTO peak_summary
+            (project, metric, latest_peak_timestamp, latest_peak_value, peak_count,
+             max_percentage_difference, last_month_timestamp, last_month_value)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                latest_peak_timestamp=VALUES(latest_peak_timestamp),
+                latest_peak_value=VALUES(latest_peak_value),
+                peak_count=VALUES(peak_count),
+                max_percentage_difference=VALUES(max_percentage_difference),
+                last_month_timestamp=VALUES(last_month_timestamp),
+                last_month_value=VALUES(last_month_value)
+        """
+        for start in range(0, len(summary_rows), self.batch_size):
+            cursor.executemany(summary_sql, summary_rows[start:start + self.batch_size])
+
+    def append_events(self, cursor, new_peaks, recorded_at=None):
+        """Append (project, timestamp, metric) rows for first-time peaks to peak_events."""
+        recorded_at = recorded_at or datetime.now(timezone.utc)
+        events = [
+            (project, timestamp, metric, is_backfill_peak(timestamp, recorded_at))
+            for project, timestamp, metric in new_peaks
+        ]
+        for start in range(0, len(events), self.batch_size):
+            cursor.executemany(
+                "INSERT INTO peak_events (project, timestamp, peak_type, is_backfill) VALUES (%s, %s, %s, %s)",
+                events[start:start + self.batch_size]
+            )
+
+    def flush(self):
+        """
+        Write all staged peaks and commit once.
+
+        Returns a dict with the number of inserted, updated, deleted and
+        flagged (stale but labeled) rows.
+        """
+        stats = {"inserted": 0, "updated": 0, "deleted": 0, "flagged": 0}
+        if not self.projects:
+            return stats
+
+        # pymysql rewrites executemany() on INSERT ... VALUES into multi-row statements
+        upsert_sql = f"""
+            INSERT INTO {self.table}
+            (project, timestamp, {self.value_column}, rolling_mean, threshold, percentage_difference)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                {self.value_column}=VALUES({self.value_column}),
+                rolling_mean=VALUES(rolling_mean),
+                threshold=VALUES(threshold),
+                percentage_difference=VALUES(percentage_difference),
+                is_stale=FALSE
+        """
+
+        try:
+            self.conn.begin()
+            with self.conn.cursor() as cursor:
+                existing = self.get_existing_peaks(cursor)
+
+                new_peaks = []
+                for start in range(0, len(self.rows), self.batch_size):
+                    batch = self.rows[start:start + self.batch_size]
+                    cursor.executemany(upsert_sql, batch)
+
+                    for row in batch:
+                        if (row[0], row[1]) in existing:
+                            stats["updated"] += 1
+                        else:
+                            stats["inserted"] += 1
+                            new_peaks.append((row[0], row[1], self.metric))
+
+                self.append_events(cursor, new_peaks)
+
+                stats["deleted"], stats["flagged"] = self.reconcile(cursor, existing)
+                self.refresh_summary(cursor)
+
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to write alerts to {self.table}, rolling back: {e}")
+            self.conn.rollback()
+            raise
+
+        self.rows = []
+        self.projects = {}
+        return stats
@@ -2,14 +2,18 @@
 
 import sys
 import os
+import argparse
 import pandas as pd
 import pymysql
 import configparser
 import logging
-from config import get_db_connection
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from config import get_db_connection
+from alerts.peak_runner import add_worker_argument, detect_peaks_for_projects
+from alerts.alert_writer import AlertWriter
+
 # --- Setup logging ---
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -51,8 +55,37 @@ def find_peaks_rolling_3_years(df, threshold_percentage=0.30):
     return peaks
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Detect edit count peaks for all projects.")
+    add_worker_argument(parser)
+    return parser.parse_args()
+
+
+# --- Per-project worker (runs in a pool process) ---
+def analyze_project(item):
+    project, group = item
+    logging.info(f"Analyzing peaks for: {project}")
+
+    peaks = find_peaks_rolling_3_years(group)
+
+    rows = [
+        (
+            project,
+            peak["timestamp"].to_pydatetime(),
+            int(peak["edit_count"]),
+            float(peak["rolling_mean"]),
+            float(peak["threshold"]),
+            float(peak["percentage_difference"]),
+        )
+        for peak in peaks
+    ]
+    return project, rows
+
+
 # --- Main logic ---
 def main():
+    args = parse_args()
+
     # Connect to DB
     conn = get_db_connection()
 
@@ -60,44 +93,28 @@ def main():
     df = pd.read_sql(f"SELECT * FROM {SOURCE_TABLE}", conn)
     df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
 
-    # Process each project
-    for project, group in df.groupby("project"):
-        logging.info(f"Analyzing peaks for: {project}")
+    # Detect peaks for every project, sharded across worker processes
+    results = detect_peaks_for_projects(df, analyze_project, args.workers)
 
-        peaks = find_peaks_rolling_3_years(group)
+    # Latest month of source data per project, for the peak summary
+    last_months = df.loc[df.groupby("project")["timestamp"].idxmax()]
+    last_month_by_project = {
+        row.project: (row.timestamp.to_pydatetime(), int(row.edit_count))
+        for row in last_months.itertuples(index=False)
+    }
 
-        if not peaks:
+    # Stage detected peaks and write them in one transaction
+    writer = AlertWriter(conn, ALERTS_TABLE, "edit_count", "edit")
+    for project, rows in results.items():
+        if not rows:
             logging.info(f"No peaks found for {project}")
-            continue
+        writer.add_peaks(project, rows, last_month_by_project.get(project))
 
-        # Insert detected peaks into DB
-        with conn.cursor() as cursor:
-            for peak in peaks:
-                try:
-                    cursor.execute(
-                        f"""
-                        INSERT INTO {ALERTS_TABLE}
-                        (project, timestamp, edit_count, rolling_mean, threshold, percentage_difference)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE 
-                            edit_count=VALUES(edit_count),
-                            rolling_mean=VALUES(rolling_mean),
-                            threshold=VALUES(threshold),
-                            percentage_difference=VALUES(percentage_difference)
-                    """,
-                        (
-                            project,
-                            peak["timestamp"].to_pydatetime(),
-                            int(peak["edit_count"]),
-                            float(peak["rolling_mean"]),
-                            float(peak["threshold"]),
-                            float(peak["percentage_difference"]),
-                        ),
-                    )
-                except Exception as e:
-                    logging.error(
-                        f"DB insert failed for {project} on {peak['timestamp']}: {e}"
-                    )
+    stats = writer.flush()
+    logging.info(
+        f"Alerts written to {ALERTS_TABLE}: {stats['inserted']} inserted, {stats['updated']} updated, "
+        f"{stats['deleted']} stale deleted, {stats['flagged']} stale flagged"
+    )
 
     conn.close()
     logging.info("Peak detection completed for all projects.")
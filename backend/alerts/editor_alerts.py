@@ -2,12 +2,16 @@
 
 import sys
 import os
+import argparse
 import pandas as pd
 import logging
-from config import get_db_connection
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from config import get_db_connection
+from alerts.peak_runner import add_worker_argument, detect_peaks_for_projects
+from alerts.alert_writer import AlertWriter
+
 # --- Setup logging ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -47,8 +51,32 @@ def find_peaks_rolling_3_years(df, threshold_percentage=0.3):
 
     return peaks
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Detect editor count peaks for all projects.")
+    add_worker_argument(parser)
+    return parser.parse_args()
+
+# --- Per-project worker (runs in a pool process) ---
+def analyze_project(item):
+    project, group = item
+    logging.info(f"Analyzing editor peaks for: {project}")
+
+    peaks = find_peaks_rolling_3_years(group)
+
+    rows = [(
+        project,
+        peak["timestamp"].to_pydatetime(),
+        int(peak["editor_count"]),
+        float(peak["rolling_mean"]),
+        float(peak["threshold"]),
+        float(peak["percentage_difference"])
+    ) for peak in peaks]
+    return project, rows
+
 # --- Main logic ---
 def main():
+    args = parse_args()
+
     # Connect to DB
     conn = get_db_connection()
 
@@ -56,42 +84,28 @@ def main():
     df = pd.read_sql(f"SELECT * FROM {SOURCE_TABLE}", conn)
     df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
 
-    # Process each project
-    for project, group in df.groupby("project"):
-        logging.info(f"Analyzing editor peaks for: {project}")
+    # Detect peaks for every project, sharded across worker processes
+    results = detect_peaks_for_projects(df, analyze_project, args.workers)
 
-        peaks = find_peaks_rolling_3_years(group)
+    # Latest month of source data per project, for the peak summary
+    last_months = df.loc[df.groupby("project")["timestamp"].idxmax()]
+    last_month_by_project = {
+        row.project: (row.timestamp.to_pydatetime(), int(row.editor_count))
+        for row in last_months.itertuples(index=False)
+    }
 
-        if not peaks:
+    # Stage detected peaks and write them in one transaction
+    writer = AlertWriter(conn, ALERTS_TABLE, "editor_count", "editor")
+    for project, rows in results.items():
+        if not rows:
             logging.info(f"No editor peaks found for {project}")
-            continue
+        writer.add_peaks(project, rows, last_month_by_project.get(project))
 
-        # Insert detected peaks into DB
-        with conn.cursor() as cursor:
-            for peak in peaks:
-                try:
-                    cursor.execute(f"""
-                        INSERT INTO {ALERTS_TABLE}
-                        (project, timestamp, editor_count, rolling_mean, threshold, percentage_difference)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE 
-                            editor_count=VALUES(editor_count),
-                            rolling_mean=VALUES(rolling_mean),
-                            threshold=VALUES(threshold),
-                            percentage_difference=VALUES(percentage_difference)
-                    """, (
-                        project,
-                        peak["timestamp"].to_pydatetime(),
-                        int(peak["editor_count"]),
-                        float(peak["rolling_mean"]),
-                        float(peak["threshold"]),
-                        float(peak["percentage_difference"])
-                    ))
-                except Exception as e:
-                    logging.error(f"DB insert failed for {project} on {peak['timestamp']}: {e}")
-            
-            # Commit the transaction for this project
-            conn.commit()
+    stats = writer.flush()
+    logging.info(
+        f"Alerts written to {ALERTS_TABLE}: {stats['inserted']} inserted, {stats['updated']} updated, "
+        f"{stats['deleted']} stale deleted, {stats['flagged']} stale flagged"
+    )
 
     conn.close()
     logging.info("Editor peak detection completed for all projects.")
@@ -0,0 +1,67 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers():
+    """Pool size from ALERT_WORKERS, falling back to the CPU count when unset or invalid."""
+    fallback = os.cpu_count() or 1
+    value = os.getenv("ALERT_WORKERS")
+    if not value:
+        return fallback
+    try:
+        workers = int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid ALERT_WORKERS={value!r}, using {fallback} workers")
+        return fallback
+    if workers < 1:
+        logger.warning(f"Ignoring ALERT_WORKERS={workers}, using {fallback} workers")
+        return fallback
+    return workers
+
+
+def add_worker_argument(parser):
+    """Add the --workers option shared by the alert jobs."""
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes used for peak detection (default: ALERT_WORKERS or CPU count). Use 1 to run serially."
+    )
+    return parser
+
+
+def detect_peaks_for_projects(df, analyze_project, workers=None):
+    """
+    Run analyze_project over every project group in df.
+
+    Projects are independent, so when more than one worker is requested the
+    groups are sharded across a process pool. analyze_project receives a
+    (project, group) tuple and must return (project, rows); it has to be a
+    module-level function so it can be pickled.
+
+    workers defaults to default_workers(), resolved at call time.
+
+    Returns a dict of project -> rows, gathered in the parent process.
+    """
+    groups = list(df.groupby("project"))
+    if not groups:
+        return {}
+
+    if workers is None:
+        workers = default_workers()
+
+    workers = max(1, min(workers, len(groups)))
+
+    if workers == 1:
+        logger.info(f"Detecting peaks for {len(groups)} projects serially")
+        return dict(map(analyze_project, groups))
+
+    # A few chunks per worker keeps the pool busy when project sizes vary a lot
+    chunksize = max(1, len(groups) // (workers * 4))
+    logger.info(f"Detecting peaks for {len(groups)} projects with {workers} workers (chunksize={chunksize})")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(analyze_project, groups, chunksize=chunksize))
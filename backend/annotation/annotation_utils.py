@@ -1,85 +1,119 @@
-import requests
+import time
+import json
+import base64
 import logging
-from utils import getHeader
+import threading
+from datetime import datetime
 from config import get_db_connection
+from annotation.edit_count_cache import get_cached_edit_count, MIN_EDIT_COUNT
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared reviewer allowlist, refreshed on a short TTL
+_REVIEWER_CACHE = {
+    "expires_at": 0,
+    "reviewers": frozenset(),
+}
+_reviewer_lock = threading.Lock()
+
+REVIEWER_CACHE_TTL_SECONDS = 60
+REVIEWER_RETRY_SECONDS = 5
+
 
 def get_user_edit_count(username):
     """
-    Fetch global edit count for a Wikimedia user.
+    Get global edit count for a Wikimedia user.
     Returns the edit count or None if user doesn't exist or API fails.
+    Served from the edit count cache (see edit_count_cache.py).
     """
-    try:
-        url = "https://meta.wikimedia.org/w/api.php"
-
-        headers = getHeader()
-        params = {
-            "action": "query",
-            "meta": "globaluserinfo",
-            "guiuser": username,
-            "guiprop": "editcount",
-            "format": "json"
-        }
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "query" in data and "globaluserinfo" in data["query"]:
-            user_info = data["query"]["globaluserinfo"]
-            if "editcount" in user_info:
-                return user_info["editcount"]
-        
-        return None
-    except Exception as e:
-        logger.error(f"Error fetching edit count for {username}: {e}")
-        return None
+    return get_cached_edit_count(username)
 
 
-def is_reviewer(username):
-    """
-    Check if a user is in the reviewer allowlist.
-    """
+def _load_reviewers():
+    """Load active reviewer usernames into the shared cache."""
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
         cursor = conn.cursor()
-        
         cursor.execute(
-            "SELECT is_active FROM annotation_reviewers WHERE username = %s",
-            (username,)
+            "SELECT username FROM annotation_reviewers WHERE is_active = TRUE"
         )
-        result = cursor.fetchone()
+        reviewers = frozenset(row[0] for row in cursor.fetchall())
+    finally:
         conn.close()
-        
-        if result and result[0]:
-            return True
-        return False
-    except Exception as e:
-        logger.error(f"Error checking reviewer status for {username}: {e}")
-        return False
 
+    _REVIEWER_CACHE["reviewers"] = reviewers
+    _REVIEWER_CACHE["expires_at"] = time.time() + REVIEWER_CACHE_TTL_SECONDS
+    return reviewers
+
+
+def get_active_reviewers():
+    """
+    Return the set of active reviewers, reloaded at most every
+    REVIEWER_CACHE_TTL_SECONDS. Reviewers are managed directly in the
+    annotation_reviewers table, so the TTL is the only invalidation.
+    """
+    if time.time() < _REVIEWER_CACHE["expires_at"]:
+        return _REVIEWER_CACHE["reviewers"]
+
+    with _reviewer_lock:
+        # Another thread may have reloaded while we waited
+        if time.time() < _REVIEWER_CACHE["expires_at"]:
+            return _REVIEWER_CACHE["reviewers"]
+        try:
+            return _load_reviewers()
+        except Exception as e:
+            logger.error(f"Error loading reviewers: {e}")
+            # Keep serving the previous snapshot and retry shortly
+            _REVIEWER_CACHE["expires_at"] = time.time() + REVIEWER_RETRY_SECONDS
+            return _REVIEWER_CACHE["reviewers"]
 
-def log_annotation_action(annotation_id, action_type, username, details=None, ip_address=None, user_agent=None):
+
+def is_reviewer(username):
+    """
+    Check if a user is in the reviewer allowlist.
+    """
+    return username in get_active_reviewers()
+
+
+AUDIT_LOG_INSERT = """
+    INSERT INTO annotation_audit_log
+    (annotation_id, action_type, username, details, ip_address, user_agent)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+def log_annotation_action(annotation_id, action_type, username, details=None, ip_address=None, user_agent=None, cursor=None):
     """
     Log an annotation-related action to the audit log.
+    Pass the caller's cursor to write the entry in the caller's transaction, so
+    it commits (or rolls back) together with the change it describes.
+    """
+    log_annotation_actions(
+        [(annotation_id, action_type, username, details, ip_address, user_agent)],
+        cursor=cursor
+    )
+
+
+def log_annotation_actions(entries, cursor=None):
     """
+    Log several (annotation_id, action_type, username, details, ip_address,
+    user_agent) entries with one multi-row insert. With cursor, the insert
+    joins the caller's transaction; otherwise it commits on its own connection.
+    """
+    if not entries:
+        return
+    if cursor is not None:
+        cursor.executemany(AUDIT_LOG_INSERT, entries)
+        return
+
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """
-            INSERT INTO annotation_audit_log 
-            (annotation_id, action_type, username, details, ip_address, user_agent)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (annotation_id, action_type, username, details, ip_address, user_agent)
-        )
-        conn.commit()
-        conn.close()
+        try:
+            conn.cursor().executemany(AUDIT_LOG_INSERT, entries)
+            conn.commit()
+        finally:
+            conn.close()
     except Exception as e:
         logger.error(f"Error logging annotation action: {e}")
 
@@ -124,6 +158,215 @@ def get_pending_reports_count():
         return 0
 
 
+PENDING_ANNOTATION_SELECT = """
+    SELECT id, project, timestamp, peak_type, description, relevant_link,
+           submitted_by, submitted_at
+    FROM peak_annotations
+"""
+
+PENDING_REPORT_SELECT = """
+    SELECT r.id, r.annotation_id, r.reported_by, r.report_reason, r.reported_at,
+           a.project, a.timestamp, a.peak_type, a.description, a.relevant_link
+    FROM annotation_reports r
+    JOIN peak_annotations a ON r.annotation_id = a.id
+"""
+
+
+def format_pending_annotation(row):
+    """Serialize a PENDING_ANNOTATION_SELECT row."""
+    return {
+        "id": row[0],
+        "project": row[1],
+        "timestamp": row[2].isoformat() if row[2] else None,
+        "peak_type": row[3],
+        "description": row[4],
+        "relevant_link": row[5],
+        "submitted_by": row[6],
+        "submitted_at": row[7].isoformat() if row[7] else None
+    }
+
+
+def format_pending_report(row):
+    """Serialize a PENDING_REPORT_SELECT row."""
+    return {
+        "report_id": row[0],
+        "annotation_id": row[1],
+        "reported_by": row[2],
+        "report_reason": row[3],
+        "reported_at": row[4].isoformat() if row[4] else None,
+        "annotation": {
+            "project": row[5],
+            "timestamp": row[6].isoformat() if row[6] else None,
+            "peak_type": row[7],
+            "description": row[8],
+            "relevant_link": row[9]
+        }
+    }
+
+
+QUEUE_MAX_PAGE_SIZE = 100
+
+# queue -> (select, column prefix, queue time column, queue time position in the select)
+_REVIEW_QUEUES = {
+    "annotations": (PENDING_ANNOTATION_SELECT, "", "submitted_at", 7),
+    "reports": (PENDING_REPORT_SELECT, "r.", "reported_at", 4),
+}
+
+
+def encode_queue_cursor(queued_at, item_id):
+    """Opaque cursor for the (submitted_at / reported_at, id) position in a review queue."""
+    raw = json.dumps([queued_at.strftime("%Y-%m-%d %H:%M:%S"), item_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_queue_cursor(cursor_value):
+    """Inverse of encode_queue_cursor; raises ValueError on a malformed cursor."""
+    try:
+        queued_at, item_id = json.loads(base64.urlsafe_b64decode(cursor_value.encode()))
+        return datetime.strptime(queued_at, "%Y-%m-%d %H:%M:%S"), int(item_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _fetch_queue_page(cursor, queue, page_size, after):
+    """
+    Read one page of a pending review queue ordered by (queue time, id) and
+    return (rows, next_cursor). One extra row is read to tell whether a next
+    page exists.
+    """
+    select_sql, prefix, time_column, time_index = _REVIEW_QUEUES[queue]
+    sql = select_sql + f" WHERE {prefix}status = 'pending'"
+    params = []
+    if after is not None:
+        # Expanded form of (time, id) > (%s, %s), which the optimizer turns into a range scan
+        sql += f" AND ({prefix}{time_column} > %s OR ({prefix}{time_column} = %s AND {prefix}id > %s))"
+        params.extend([after[0], after[0], after[1]])
+    sql += f" ORDER BY {prefix}{time_column} ASC, {prefix}id ASC LIMIT %s"
+    params.append(page_size + 1)
+
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_queue_cursor(last[time_index], last[0])
+    return rows, next_cursor
+
+
+def get_pending_annotations_page(page_size, after=None):
+    """
+    One page of pending annotations, oldest first. after is a decoded
+    (submitted_at, id) cursor. Returns (annotations, next_cursor).
+    """
+    conn = get_db_connection()
+    try:
+        rows, next_cursor = _fetch_queue_page(
+            conn.cursor(), "annotations", page_size, after
+        )
+    finally:
+        conn.close()
+    return [format_pending_annotation(row) for row in rows], next_cursor
+
+
+def get_pending_reports_page(page_size, after=None):
+    """
+    One page of pending reports, oldest first. after is a decoded
+    (reported_at, id) cursor. Returns (reports, next_cursor).
+    """
+    conn = get_db_connection()
+    try:
+        rows, next_cursor = _fetch_queue_page(
+            conn.cursor(), "reports", page_size, after
+        )
+    finally:
+        conn.close()
+    return [format_pending_report(row) for row in rows], next_cursor
+
+
+# Reviewer dashboard snapshots, shared by all reviewers for a few seconds
+_DASHBOARD_CACHE = {}
+DASHBOARD_CACHE_TTL_SECONDS = 5
+
+
+def invalidate_dashboard_cache():
+    """Drop cached dashboard snapshots; call after a queue changes."""
+    _DASHBOARD_CACHE.clear()
+
+
+def get_reviewer_dashboard(page_size, since_annotation_id=None, since_report_id=None):
+    """
+    Pending counts plus the first page of both review queues, read over a
+    single connection. With since_*_id only items newer than that id are
+    returned, for incremental polling.
+    """
+    cache_key = (page_size, since_annotation_id, since_report_id)
+    cached = _DASHBOARD_CACHE.get(cache_key)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM peak_annotations WHERE status = 'pending'),
+                (SELECT COUNT(*) FROM annotation_reports WHERE status = 'pending')
+            """
+        )
+        pending_annotations, pending_reports = cursor.fetchone()
+
+        if since_annotation_id is not None:
+            cursor.execute(
+                PENDING_ANNOTATION_SELECT + " WHERE status = 'pending' AND id > %s ORDER BY id ASC LIMIT %s",
+                (since_annotation_id, page_size)
+            )
+            rows = cursor.fetchall()
+            annotations_next_cursor = None
+        else:
+            rows, annotations_next_cursor = _fetch_queue_page(
+                cursor, "annotations", page_size, None
+            )
+        annotations = [format_pending_annotation(row) for row in rows]
+
+        if since_report_id is not None:
+            cursor.execute(
+                PENDING_REPORT_SELECT + " WHERE r.status = 'pending' AND r.id > %s ORDER BY r.id ASC LIMIT %s",
+                (since_report_id, page_size)
+            )
+            rows = cursor.fetchall()
+            reports_next_cursor = None
+        else:
+            rows, reports_next_cursor = _fetch_queue_page(
+                cursor, "reports", page_size, None
+            )
+        reports = [format_pending_report(row) for row in rows]
+    finally:
+        conn.close()
+
+    dashboard = {
+        "stats": {
+            "pending_annotations": pending_annotations,
+            "pending_reports": pending_reports,
+            "total_pending": pending_annotations + pending_reports
+        },
+        "annotations": annotations,
+        "reports": reports,
+        "annotations_next_cursor": annotations_next_cursor,
+        "reports_next_cursor": reports_next_cursor,
+        "latest_annotation_id": max([a["id"] for a in annotations], default=since_annotation_id),
+        "latest_report_id": max([r["report_id"] for r in reports], default=since_report_id)
+    }
+
+    if len(_DASHBOARD_CACHE) > 64:
+        _DASHBOARD_CACHE.clear()
+    _DASHBOARD_CACHE[cache_key] = (time.time() + DASHBOARD_CACHE_TTL_SECONDS, dashboard)
+    return dashboard
+
+
 def send_reviewer_notification(subject, message_body):
     """
     Send email notification to all active reviewers using MediaWiki EmailUser API.
@@ -135,14 +378,7 @@ def send_reviewer_notification(subject, message_body):
     3. Handle rate limiting and errors
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT username FROM annotation_reviewers WHERE is_active = TRUE"
-        )
-        reviewers = cursor.fetchall()
-        conn.close()
+        reviewers = get_active_reviewers()
         
         logger.info(f"Would send notification to {len(reviewers)} reviewers: {subject}")
         logger.info(f"Message: {message_body}")
@@ -158,6 +394,74 @@ def send_reviewer_notification(subject, message_body):
         return False
 
 
+def get_annotations_for_range(project, peak_type, start=None, end=None, conn=None):
+    """
+    Get all visible approved annotations of a project and metric between
+    start and end (inclusive), served by the (project, timestamp) index.
+    Returns {"YYYY-MM-DD": annotation} keyed by peak date; when a peak has
+    several, the most recently reviewed one wins, as in get_annotation_for_peak.
+    Pass conn to reuse an open connection (it is left open).
+    """
+    query = """
+        SELECT id, timestamp, description, relevant_link, submitted_by, submitted_at
+        FROM peak_annotations
+        WHERE project = %s AND peak_type = %s
+        AND status = 'approved' AND is_visible = TRUE
+    """
+    params = [project, peak_type]
+    if start is not None:
+        query += " AND timestamp >= %s"
+        params.append(start)
+    if end is not None:
+        query += " AND timestamp <= %s"
+        params.append(end)
+    query += " ORDER BY timestamp ASC, reviewed_at DESC"
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    annotations = {}
+    for row in results:
+        key = row[1].strftime("%Y-%m-%d")
+        if key in annotations:
+            continue
+        annotations[key] = {
+            "id": row[0],
+            "timestamp": row[1].isoformat(),
+            "description": row[2],
+            "relevant_link": row[3],
+            "submitted_by": row[4],
+            "submitted_at": row[5].isoformat() if row[5] else None
+        }
+    return annotations
+
+
+# Callbacks run after the set of visible annotations may have changed
+_annotation_change_listeners = []
+
+
+def on_annotations_changed(callback):
+    """Register a callback (e.g. to drop cached chart responses embedding annotations)."""
+    _annotation_change_listeners.append(callback)
+    return callback
+
+
+def notify_annotations_changed():
+    for callback in _annotation_change_listeners:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Annotation change listener failed: {e}")
+
+
 def get_annotation_for_peak(project, timestamp, peak_type):
     """
     Get approved annotation for a specific peak.
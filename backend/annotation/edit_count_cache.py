@@ -0,0 +1,261 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import get_db_connection
+from http_client import get_json
+
+logger = logging.getLogger(__name__)
+
+GLOBALUSERINFO_URL = "https://meta.wikimedia.org/w/api.php"
+
+# Global edit count required to submit or edit annotations
+MIN_EDIT_COUNT = 1000
+
+# Edit counts only grow, so a day-old value is good enough once a user is eligible
+POSITIVE_TTL_SECONDS = 24 * 3600
+# Users below MIN_EDIT_COUNT and unknown users are re-checked sooner,
+# API failures sooner still (memory only)
+BELOW_THRESHOLD_TTL_SECONDS = 600
+NEGATIVE_TTL_SECONDS = 600
+FAILURE_TTL_SECONDS = 60
+
+_MISSING = object()
+
+# globaluserinfo resolves one user per call, so batches fan out over a few threads
+FETCH_CONCURRENCY = 4
+
+# username -> (edit_count or None, expires_at)
+_EDIT_COUNT_CACHE = {}
+_cache_lock = threading.Lock()
+
+_refreshing = set()
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="edit-count-refresh")
+
+
+def fetch_global_edit_count(username):
+    """
+    Ask meta.wikimedia.org for a user's global edit count.
+    Returns None when the user does not exist; raises when the API call fails.
+    """
+    params = {
+        "action": "query",
+        "meta": "globaluserinfo",
+        "guiuser": username,
+        "guiprop": "editcount",
+        "format": "json"
+    }
+    data = get_json(GLOBALUSERINFO_URL, params=params, timeout=(3.05, 5))
+
+    user_info = data.get("query", {}).get("globaluserinfo", {})
+    return user_info.get("editcount")
+
+
+def _ttl_for(edit_count):
+    if edit_count is None:
+        return NEGATIVE_TTL_SECONDS
+    if edit_count < MIN_EDIT_COUNT:
+        return BELOW_THRESHOLD_TTL_SECONDS
+    return POSITIVE_TTL_SECONDS
+
+
+def _below_threshold(edit_count):
+    return edit_count is not None and edit_count < MIN_EDIT_COUNT
+
+
+def _remember(username, edit_count, ttl):
+    with _cache_lock:
+        _EDIT_COUNT_CACHE[username] = (edit_count, time.time() + ttl)
+
+
+def _load_from_db(username):
+    """Return (edit_count, age_seconds) from user_edit_counts, or None."""
+    try:
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT edit_count, TIMESTAMPDIFF(SECOND, fetched_at, NOW())
+                FROM user_edit_counts WHERE username = %s
+                """,
+                (username,)
+            )
+            return cursor.fetchone()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"Error reading cached edit count for {username}: {e}")
+        return None
+
+
+def store_edit_counts(counts):
+    """Persist {username: edit_count or None} to user_edit_counts."""
+    if not counts:
+        return
+    try:
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO user_edit_counts (username, edit_count, fetched_at)
+                VALUES (%s, %s, NOW())
+                ON DUPLICATE KEY UPDATE
+                    edit_count = VALUES(edit_count),
+                    fetched_at = VALUES(fetched_at)
+                """,
+                list(counts.items())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"Error storing edit counts: {e}")
+
+
+def refresh_edit_count(username):
+    """Fetch a user's edit count from the API and update both cache layers."""
+    try:
+        edit_count = fetch_global_edit_count(username)
+    except Exception as e:
+        logger.error(f"Error fetching edit count for {username}: {e}")
+        return _MISSING
+
+    _remember(username, edit_count, _ttl_for(edit_count))
+    store_edit_counts({username: edit_count})
+    return edit_count
+
+
+def _refresh_in_background(username):
+    with _cache_lock:
+        if username in _refreshing:
+            return
+        _refreshing.add(username)
+
+    def run():
+        try:
+            refresh_edit_count(username)
+        finally:
+            with _cache_lock:
+                _refreshing.discard(username)
+
+    _refresh_executor.submit(run)
+
+
+def _refresh_stale(username, edit_count):
+    """Return the value to serve for an expired edit_count, refreshing it."""
+    if not _below_threshold(edit_count):
+        _refresh_in_background(username)
+        return edit_count
+
+    refreshed = refresh_edit_count(username)
+    if refreshed is _MISSING:
+        # Keep the old count and retry after FAILURE_TTL_SECONDS
+        _remember(username, edit_count, FAILURE_TTL_SECONDS)
+        return edit_count
+    return refreshed
+
+
+def get_cached_edit_count(username):
+    """
+    Return a user's global edit count, or None if unknown.
+
+    Lookups go memory -> user_edit_counts table -> API. Stale values are
+    served immediately while a background refresh runs, so only users never
+    seen before wait on meta.wikimedia.org. A stale count below MIN_EDIT_COUNT
+    is re-fetched first instead, so a user who just crossed the threshold is
+    not rejected on old data.
+    """
+    now = time.time()
+    entry = _EDIT_COUNT_CACHE.get(username)
+    if entry is not None:
+        edit_count, expires_at = entry
+        if expires_at <= now:
+            return _refresh_stale(username, edit_count)
+        return edit_count
+
+    stored = _load_from_db(username)
+    if stored is not None:
+        edit_count, age = stored
+        ttl = _ttl_for(edit_count)
+        _remember(username, edit_count, ttl - (age or 0))
+        if age is None or age >= ttl:
+            return _refresh_stale(username, edit_count)
+        return edit_count
+
+    edit_count = refresh_edit_count(username)
+    if edit_count is _MISSING:
+        # Avoid hammering a failing API for the same user
+        _remember(username, None, FAILURE_TTL_SECONDS)
+        return None
+    return edit_count
+
+
+def fetch_edit_counts(usernames, concurrency=FETCH_CONCURRENCY):
+    """
+    Fetch edit counts for many users from the API, a few calls at a time, and
+    store them in both cache layers with one multi-row write.
+    Returns {username: edit_count or None}; users whose call failed are left out.
+    """
+    fetched = {}
+    if not usernames:
+        return fetched
+
+    def fetch(username):
+        try:
+            return username, fetch_global_edit_count(username)
+        except Exception as e:
+            logger.error(f"Error fetching edit count for {username}: {e}")
+            return username, _MISSING
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="edit-count-batch") as executor:
+        for username, edit_count in executor.map(fetch, usernames):
+            if edit_count is _MISSING:
+                _remember(username, None, FAILURE_TTL_SECONDS)
+                continue
+            _remember(username, edit_count, _ttl_for(edit_count))
+            fetched[username] = edit_count
+
+    store_edit_counts(fetched)
+    return fetched
+
+
+def get_users_to_prewarm(cursor):
+    """
+    Users appearing in the watchlists or as annotation submitters whose stored
+    edit count is missing or past its TTL.
+    """
+    cursor.execute(
+        """
+        SELECT u.username
+        FROM (
+            SELECT username FROM user_project_watchlist WHERE is_active = TRUE
+            UNION
+            SELECT username FROM user_language_watchlist WHERE is_active = TRUE
+            UNION
+            SELECT submitted_by FROM peak_annotations
+        ) u
+        LEFT JOIN user_edit_counts c ON c.username = u.username
+        WHERE c.username IS NULL
+           OR (c.edit_count >= %s AND c.fetched_at < NOW() - INTERVAL %s SECOND)
+           OR (c.edit_count < %s AND c.fetched_at < NOW() - INTERVAL %s SECOND)
+           OR (c.edit_count IS NULL AND c.fetched_at < NOW() - INTERVAL %s SECOND)
+        """,
+        (MIN_EDIT_COUNT, POSITIVE_TTL_SECONDS, MIN_EDIT_COUNT, BELOW_THRESHOLD_TTL_SECONDS, NEGATIVE_TTL_SECONDS)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def prewarm_edit_counts(concurrency=FETCH_CONCURRENCY):
+    """Refresh stored edit counts for every watchlist user and annotation submitter that needs it."""
+    conn = get_db_connection()
+    try:
+        usernames = get_users_to_prewarm(conn.cursor())
+    finally:
+        conn.close()
+
+    logger.info(f"Prewarming edit counts for {len(usernames)} users")
+    fetched = fetch_edit_counts(usernames, concurrency)
+    logger.info(f"Stored edit counts for {len(fetched)} users ({len(usernames) - len(fetched)} failed)")
+    return len(usernames), len(fetched)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Periodic job: refresh cached global edit counts for watchlist users and annotators."""
+
+import sys
+import os
+import argparse
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from annotation.edit_count_cache import prewarm_edit_counts, FETCH_CONCURRENCY
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prewarm the user_edit_counts cache.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=FETCH_CONCURRENCY,
+        help=f"Parallel globaluserinfo requests (default: {FETCH_CONCURRENCY})."
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        prewarm_edit_counts(max(1, args.concurrency))
+    except Exception as e:
+        logging.error(f"Edit count prewarm failed: {e}", exc_info=True)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
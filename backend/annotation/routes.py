@@ -6,14 +6,97 @@ from annotation.annotation_utils import (
     get_user_edit_count,
     is_reviewer,
     log_annotation_action,
+    log_annotation_actions,
     get_pending_annotations_count,
     get_pending_reports_count,
     send_reviewer_notification,
-    get_annotation_for_peak
+    get_annotation_for_peak,
+    get_annotations_for_range,
+    notify_annotations_changed,
+    get_reviewer_dashboard,
+    invalidate_dashboard_cache,
+    get_pending_annotations_page,
+    get_pending_reports_page,
+    decode_queue_cursor,
+    QUEUE_MAX_PAGE_SIZE,
+    MIN_EDIT_COUNT
 )
 
 logger = logging.getLogger(__name__)
 
+# review action -> (audit action type, audit details, response message)
+REVIEW_ACTIONS = {
+    'approve': ('review_approve', "Approved annotation by {submitted_by}", "Annotation approved"),
+    'reject': ('review_reject', "Rejected annotation by {submitted_by}", "Annotation rejected"),
+    'edit': ('review_edit', "Edited and approved annotation by {submitted_by}", "Annotation edited and approved"),
+}
+
+# report action -> (action_taken, audit details or None, response message)
+REPORT_ACTIONS = {
+    'dismiss': ('no_action', None, "Report dismissed"),
+    'edit': ('edited', "Edited annotation based on report #{report_id}", "Annotation edited"),
+    'remove': ('removed', "Removed annotation based on report #{report_id}", "Annotation removed"),
+}
+
+# Most items accepted by one bulk review request
+BULK_REVIEW_MAX_ITEMS = 100
+
+
+def _id_placeholders(count):
+    return ", ".join(["%s"] * count)
+
+
+def _parse_bulk_item(item, id_field, actions, require_edit_length):
+    """
+    Validate one bulk review item. Returns (item_id, action, edited_description,
+    edited_link, error); error is None for a valid item.
+    """
+    if not isinstance(item, dict):
+        return None, None, None, None, "Invalid item"
+    try:
+        item_id = int(item.get(id_field))
+    except (TypeError, ValueError):
+        return None, None, None, None, f"Missing or invalid {id_field}"
+
+    action = item.get('action')
+    if action not in actions:
+        return item_id, None, None, None, "Invalid action"
+
+    edited_description = None
+    edited_link = None
+    if action == 'edit':
+        edited_description = (item.get('edited_description') or '').strip()
+        edited_link = (item.get('edited_link') or '').strip() or None
+        if not edited_description:
+            return item_id, action, None, None, "Edited description required"
+        word_count = len(edited_description.split())
+        if require_edit_length and word_count > 50:
+            return item_id, action, None, None, f"Description exceeds 50 words (current: {word_count})"
+
+    return item_id, action, edited_description, edited_link, None
+
+
+def _collect_bulk_items(items, id_field, actions, require_edit_length):
+    """
+    Validate a bulk review request body. Returns (results, pending) where
+    results holds per-item error dicts (None for valid items) and pending maps
+    item id -> (index, action, edited_description, edited_link, notes).
+    """
+    results = [None] * len(items)
+    pending = {}
+    for index, item in enumerate(items):
+        item_id, action, edited_description, edited_link, error = _parse_bulk_item(
+            item, id_field, actions, require_edit_length
+        )
+        if error is None and item_id in pending:
+            error = f"Duplicate {id_field} in request"
+        if error:
+            results[index] = {id_field: item_id, "success": False, "error": error}
+            continue
+        pending[item_id] = (index, action, edited_description, edited_link, item.get('notes'))
+    return results, pending
+
+
 def create_annotation_blueprint(mwo_auth):
     annotation_bp = Blueprint('annotations', __name__)
 
@@ -61,9 +144,9 @@ def create_annotation_blueprint(mwo_auth):
             else:
                 return jsonify({"error": "Unable to verify edit count"}), 500
         
-        if edit_count < 1000 and not is_reviewer(username):
+        if edit_count < MIN_EDIT_COUNT and not is_reviewer(username):
             return jsonify({
-                "error": f"Insufficient edit count. Required: 1000, Current: {edit_count}"
+                "error": f"Insufficient edit count. Required: {MIN_EDIT_COUNT}, Current: {edit_count}"
             }), 403
         
         try:
@@ -85,6 +168,8 @@ def create_annotation_blueprint(mwo_auth):
                 conn.close()
                 return jsonify({"error": "You already have a pending annotation for this peak"}), 409
             
+            # Connections autocommit; the insert and its audit row commit together
+            conn.begin()
             # Insert annotation as approved (auto-approve)
             cursor.execute(
                 """
@@ -95,7 +180,6 @@ def create_annotation_blueprint(mwo_auth):
                 (project, timestamp, peak_type, description, relevant_link, username, username, datetime.now())
             )
             annotation_id = cursor.lastrowid
-            conn.commit()
             # Log the action
             log_annotation_action(
                 annotation_id, 
@@ -103,9 +187,13 @@ def create_annotation_blueprint(mwo_auth):
                 username,
                 f"Submitted annotation for {project} at {timestamp} (auto-approved)",
                 request.remote_addr,
-                request.headers.get('User-Agent')
+                request.headers.get('User-Agent'),
+                cursor=cursor
             )
+            conn.commit()
             conn.close()
+            invalidate_dashboard_cache()
+            notify_annotations_changed()
             return jsonify({
                 "success": True,
                 "annotation_id": annotation_id,
@@ -137,11 +225,44 @@ def create_annotation_blueprint(mwo_auth):
         else:
             return jsonify({"annotation": None}), 200
 
+    # --- Get Annotations for a Chart Range ---
+    @annotation_bp.route('/range', methods=['GET'])
+    def get_range_annotations():
+        """
+        Get all approved annotations of a project and peak type, optionally
+        limited to a start/end date range, in one request.
+        Public endpoint - no authentication required.
+        """
+        project = request.args.get('project')
+        peak_type = request.args.get('peak_type', 'edit')
+        start = request.args.get('start')
+        end = request.args.get('end')
+        
+        if not project:
+            return jsonify({"error": "Missing required parameters"}), 400
+        if peak_type not in ('edit', 'editor'):
+            return jsonify({"error": "Invalid peak_type"}), 400
+        
+        try:
+            start = datetime.strptime(start, '%Y-%m-%d') if start else None
+            end = datetime.strptime(end, '%Y-%m-%d') if end else None
+        except ValueError:
+            return jsonify({"error": "Invalid date format, expected YYYY-MM-DD"}), 400
+        
+        try:
+            annotations = get_annotations_for_range(project, peak_type, start, end)
+            return jsonify({"annotations": annotations}), 200
+            
+        except Exception as e:
+            logger.error(f"Error fetching annotations for range: {e}")
+            return jsonify({"error": "Failed to fetch annotations"}), 500
+
     # --- Get Pending Annotations (Reviewers Only) ---
     @annotation_bp.route('/pending', methods=['GET'])
     def get_pending_annotations():
         """
-        Get all pending annotations for review.
+        Get a page of pending annotations for review, oldest first.
+        Pass the returned next_cursor as ?cursor= to fetch the next page.
         Requires: reviewer privileges
         """
         current_user = mwo_auth.get_current_user(True)
@@ -154,35 +275,16 @@ def create_annotation_blueprint(mwo_auth):
             return jsonify({"error": "Reviewer privileges required"}), 403
         
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                SELECT id, project, timestamp, peak_type, description, relevant_link, 
-                       submitted_by, submitted_at
-                FROM peak_annotations
-                WHERE status = 'pending'
-                ORDER BY submitted_at ASC
-                """
-            )
-            results = cursor.fetchall()
-            conn.close()
-            
-            annotations = []
-            for row in results:
-                annotations.append({
-                    "id": row[0],
-                    "project": row[1],
-                    "timestamp": row[2].isoformat() if row[2] else None,
-                    "peak_type": row[3],
-                    "description": row[4],
-                    "relevant_link": row[5],
-                    "submitted_by": row[6],
-                    "submitted_at": row[7].isoformat() if row[7] else None
-                })
+            page_size = min(QUEUE_MAX_PAGE_SIZE, max(1, int(request.args.get('page_size', 50))))
+            cursor_value = request.args.get('cursor')
+            after = decode_queue_cursor(cursor_value) if cursor_value else None
+        except ValueError:
+            return jsonify({"error": "Invalid parameters"}), 400
+        
+        try:
+            annotations, next_cursor = get_pending_annotations_page(page_size, after)
             
-            return jsonify({"annotations": annotations}), 200
+            return jsonify({"annotations": annotations, "next_cursor": next_cursor}), 200
             
         except Exception as e:
             logger.error(f"Error fetching pending annotations: {e}")
@@ -214,136 +316,106 @@ def create_annotation_blueprint(mwo_auth):
         if action not in ['approve', 'reject', 'edit']:
             return jsonify({"error": "Invalid action"}), 400
         
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+        edited_description = None
+        edited_link = None
+        if action == 'edit':
+            edited_description = (data.get('edited_description') or '').strip()
+            edited_link = (data.get('edited_link') or '').strip() or None
             
-            # Get current annotation
-            cursor.execute(
-                """
-                SELECT description, relevant_link, submitted_by, status
-                FROM peak_annotations WHERE id = %s
-                """,
-                (annotation_id,)
-            )
-            result = cursor.fetchone()
+            if not edited_description:
+                return jsonify({"error": "Edited description required"}), 400
             
-            if not result:
-                conn.close()
-                return jsonify({"error": "Annotation not found"}), 404
-            
-            original_description, original_link, submitted_by, current_status = result
-            
-            if current_status != 'pending':
-                conn.close()
-                return jsonify({"error": "Annotation already reviewed"}), 409
-            
-            if action == 'approve':
-                # Approve annotation
-                cursor.execute(
-                    """
-                    UPDATE peak_annotations
-                    SET status = 'approved', is_visible = TRUE, 
-                        reviewed_by = %s, reviewed_at = %s
-                    WHERE id = %s
-                    """,
-                    (username, datetime.now(), annotation_id)
-                )
-                
-                # Log review
-                cursor.execute(
-                    """
-                    INSERT INTO annotation_reviews
-                    (annotation_id, reviewer_username, action, review_notes)
-                    VALUES (%s, %s, 'approve', %s)
-                    """,
-                    (annotation_id, username, data.get('notes'))
-                )
-                
-                log_annotation_action(
-                    annotation_id, 'review_approve', username,
-                    f"Approved annotation by {submitted_by}",
-                    request.remote_addr, request.headers.get('User-Agent')
-                )
-                
-                message = "Annotation approved"
+            # Validate edited description length
+            word_count = len(edited_description.split())
+            if word_count > 50:
+                return jsonify({"error": f"Description exceeds 50 words (current: {word_count})"}), 400
+        
+        audit_action, audit_details, message = REVIEW_ACTIONS[action]
+        
+        try:
+            conn = get_db_connection()
+            try:
+                conn.begin()
+                cursor = conn.cursor()
                 
-            elif action == 'reject':
-                # Reject annotation
+                # Lock the annotation so concurrent reviews of it serialize here
                 cursor.execute(
                     """
-                    UPDATE peak_annotations
-                    SET status = 'rejected', reviewed_by = %s, reviewed_at = %s
-                    WHERE id = %s
+                    SELECT description, relevant_link, submitted_by, status
+                    FROM peak_annotations WHERE id = %s
+                    FOR UPDATE
                     """,
-                    (username, datetime.now(), annotation_id)
-                )
-                
-                cursor.execute(
-                    """
-                    INSERT INTO annotation_reviews
-                    (annotation_id, reviewer_username, action, review_notes)
-                    VALUES (%s, %s, 'reject', %s)
-                    """,
-                    (annotation_id, username, data.get('notes'))
-                )
-                
-                log_annotation_action(
-                    annotation_id, 'review_reject', username,
-                    f"Rejected annotation by {submitted_by}",
-                    request.remote_addr, request.headers.get('User-Agent')
+                    (annotation_id,)
                 )
+                result = cursor.fetchone()
                 
-                message = "Annotation rejected"
-                
-            elif action == 'edit':
-                # Edit and approve annotation
-                edited_description = data.get('edited_description', '').strip()
-                edited_link = data.get('edited_link', '').strip() or None
+                if not result:
+                    conn.rollback()
+                    return jsonify({"error": "Annotation not found"}), 404
                 
-                if not edited_description:
-                    conn.close()
-                    return jsonify({"error": "Edited description required"}), 400
+                original_description, original_link, submitted_by, current_status = result
                 
-                # Validate edited description length
-                word_count = len(edited_description.split())
-                if word_count > 50:
-                    conn.close()
-                    return jsonify({"error": f"Description exceeds 50 words (current: {word_count})"}), 400
+                if current_status != 'pending':
+                    conn.rollback()
+                    return jsonify({"error": "Annotation already reviewed"}), 409
                 
-                cursor.execute(
-                    """
-                    UPDATE peak_annotations
-                    SET description = %s, relevant_link = %s, 
-                        status = 'approved', is_visible = TRUE,
-                        reviewed_by = %s, reviewed_at = %s
-                    WHERE id = %s
-                    """,
-                    (edited_description, edited_link, username, datetime.now(), annotation_id)
-                )
+                if action == 'reject':
+                    cursor.execute(
+                        """
+                        UPDATE peak_annotations
+                        SET status = 'rejected', reviewed_by = %s, reviewed_at = %s
+                        WHERE id = %s AND status = 'pending'
+                        """,
+                        (username, datetime.now(), annotation_id)
+                    )
+                else:
+                    # approve keeps the submitted text, edit replaces it
+                    if action == 'approve':
+                        new_description, new_link = original_description, original_link
+                    else:
+                        new_description, new_link = edited_description, edited_link
+                    cursor.execute(
+                        """
+                        UPDATE peak_annotations
+                        SET description = %s, relevant_link = %s,
+                            status = 'approved', is_visible = TRUE,
+                            reviewed_by = %s, reviewed_at = %s
+                        WHERE id = %s AND status = 'pending'
+                        """,
+                        (new_description, new_link, username, datetime.now(), annotation_id)
+                    )
                 
+                # Log review
                 cursor.execute(
                     """
                     INSERT INTO annotation_reviews
                     (annotation_id, reviewer_username, action, 
                      original_description, edited_description, 
                      original_link, edited_link, review_notes)
-                    VALUES (%s, %s, 'edit', %s, %s, %s, %s, %s)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                     """,
-                    (annotation_id, username, original_description, edited_description,
-                     original_link, edited_link, data.get('notes'))
+                    (annotation_id, username, action,
+                     original_description if action == 'edit' else None, edited_description,
+                     original_link if action == 'edit' else None, edited_link,
+                     data.get('notes'))
                 )
                 
                 log_annotation_action(
-                    annotation_id, 'review_edit', username,
-                    f"Edited and approved annotation by {submitted_by}",
-                    request.remote_addr, request.headers.get('User-Agent')
+                    annotation_id, audit_action, username,
+                    audit_details.format(submitted_by=submitted_by),
+                    request.remote_addr, request.headers.get('User-Agent'),
+                    cursor=cursor
                 )
                 
-                message = "Annotation edited and approved"
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
             
-            conn.commit()
-            conn.close()
+            invalidate_dashboard_cache()
+            notify_annotations_changed()
             
             return jsonify({"success": True, "message": message}), 200
             
@@ -351,6 +423,151 @@ def create_annotation_blueprint(mwo_auth):
             logger.error(f"Error reviewing annotation: {e}")
             return jsonify({"error": "Failed to review annotation"}), 500
 
+    # --- Bulk Review Annotations (Reviewers Only) ---
+    @annotation_bp.route('/review/bulk', methods=['POST'])
+    def bulk_review_annotations():
+        """
+        Review up to BULK_REVIEW_MAX_ITEMS annotations in one transaction.
+        Body: {"reviews": [{"annotation_id", "action", "notes",
+                            "edited_description", "edited_link"}, ...]}
+        Returns one result per item; invalid or already reviewed items are
+        reported without affecting the others.
+        Requires: reviewer privileges
+        """
+        current_user = mwo_auth.get_current_user(True)
+        if not current_user:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        username = current_user
+        
+        if not is_reviewer(username):
+            return jsonify({"error": "Reviewer privileges required"}), 403
+        
+        reviews = (request.json or {}).get('reviews')
+        if not isinstance(reviews, list) or not reviews:
+            return jsonify({"error": "Missing required fields"}), 400
+        if len(reviews) > BULK_REVIEW_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_REVIEW_MAX_ITEMS} reviews per request"}), 400
+        
+        results, pending = _collect_bulk_items(reviews, 'annotation_id', REVIEW_ACTIONS, True)
+        ip_address = request.remote_addr
+        user_agent = request.headers.get('User-Agent')
+        succeeded = 0
+        
+        try:
+            if pending:
+                conn = get_db_connection()
+                try:
+                    conn.begin()
+                    cursor = conn.cursor()
+                    
+                    ids = list(pending)
+                    cursor.execute(
+                        f"""
+                        SELECT id, description, relevant_link, submitted_by, status
+                        FROM peak_annotations WHERE id IN ({_id_placeholders(len(ids))})
+                        FOR UPDATE
+                        """,
+                        ids
+                    )
+                    current = {row[0]: row[1:] for row in cursor.fetchall()}
+                    
+                    now = datetime.now()
+                    status_ids = {'approve': [], 'reject': []}
+                    edits = []
+                    review_rows = []
+                    audit_rows = []
+                    
+                    for annotation_id, (index, action, edited_description, edited_link, notes) in pending.items():
+                        row = current.get(annotation_id)
+                        if row is None:
+                            results[index] = {"annotation_id": annotation_id, "success": False, "error": "Annotation not found"}
+                            continue
+                        original_description, original_link, submitted_by, status = row
+                        if status != 'pending':
+                            results[index] = {"annotation_id": annotation_id, "success": False, "error": "Annotation already reviewed"}
+                            continue
+                        
+                        if action == 'edit':
+                            edits.append((edited_description, edited_link, username, now, annotation_id))
+                        else:
+                            status_ids[action].append(annotation_id)
+                        
+                        review_rows.append((
+                            annotation_id, username, action,
+                            original_description if action == 'edit' else None, edited_description,
+                            original_link if action == 'edit' else None, edited_link,
+                            notes
+                        ))
+                        audit_action, audit_details, message = REVIEW_ACTIONS[action]
+                        audit_rows.append((
+                            annotation_id, audit_action, username,
+                            audit_details.format(submitted_by=submitted_by),
+                            ip_address, user_agent
+                        ))
+                        results[index] = {"annotation_id": annotation_id, "success": True, "message": message}
+                    
+                    if status_ids['approve']:
+                        cursor.execute(
+                            f"""
+                            UPDATE peak_annotations
+                            SET status = 'approved', is_visible = TRUE,
+                                reviewed_by = %s, reviewed_at = %s
+                            WHERE id IN ({_id_placeholders(len(status_ids['approve']))}) AND status = 'pending'
+                            """,
+                            [username, now] + status_ids['approve']
+                        )
+                    if status_ids['reject']:
+                        cursor.execute(
+                            f"""
+                            UPDATE peak_annotations
+                            SET status = 'rejected', reviewed_by = %s, reviewed_at = %s
+                            WHERE id IN ({_id_placeholders(len(status_ids['reject']))}) AND status = 'pending'
+                            """,
+                            [username, now] + status_ids['reject']
+                        )
+                    if edits:
+                        cursor.executemany(
+                            """
+                            UPDATE peak_annotations
+                            SET description = %s, relevant_link = %s,
+                                status = 'approved', is_visible = TRUE,
+                                reviewed_by = %s, reviewed_at = %s
+                            WHERE id = %s AND status = 'pending'
+                            """,
+                            edits
+                        )
+                    if review_rows:
+                        cursor.executemany(
+                            """
+                            INSERT INTO annotation_reviews
+                            (annotation_id, reviewer_username, action, 
+                             original_description, edited_description, 
+                             original_link, edited_link, review_notes)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                            """,
+                            review_rows
+                        )
+                    log_annotation_actions(audit_rows, cursor=cursor)
+                    
+                    conn.commit()
+                    succeeded = len(review_rows)
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.close()
+            
+            if succeeded:
+                invalidate_dashboard_cache()
+                notify_annotations_changed()
+            
+            return jsonify({"results": results, "succeeded": succeeded}), 200
+            
+        except Exception as e:
+            logger.error(f"Error bulk reviewing annotations: {e}")
+            return jsonify({"error": "Failed to review annotations"}), 500
+
     # --- Report Annotation ---
     @annotation_bp.route('/report', methods=['POST'])
     def report_annotation():
@@ -405,6 +622,8 @@ def create_annotation_blueprint(mwo_auth):
                 conn.close()
                 return jsonify({"error": "You already reported this annotation"}), 409
             
+            # Connections autocommit; the report and its audit row commit together
+            conn.begin()
             # Insert report
             cursor.execute(
                 """
@@ -415,14 +634,16 @@ def create_annotation_blueprint(mwo_auth):
                 (annotation_id, username, report_reason)
             )
             report_id = cursor.lastrowid
-            conn.commit()
             
             # Log the action
             log_annotation_action(
                 annotation_id, 'report', username,
                 f"Reported annotation: {report_reason}",
-                request.remote_addr, request.headers.get('User-Agent')
+                request.remote_addr, request.headers.get('User-Agent'),
+                cursor=cursor
             )
+            conn.commit()
+            invalidate_dashboard_cache()
             
             # Notify reviewers
             send_reviewer_notification(
@@ -446,7 +667,8 @@ def create_annotation_blueprint(mwo_auth):
     @annotation_bp.route('/reports/pending', methods=['GET'])
     def get_pending_reports():
         """
-        Get all pending reports for review.
+        Get a page of pending reports for review, oldest first.
+        Pass the returned next_cursor as ?cursor= to fetch the next page.
         Requires: reviewer privileges
         """
         current_user = mwo_auth.get_current_user(True)
@@ -459,40 +681,16 @@ def create_annotation_blueprint(mwo_auth):
             return jsonify({"error": "Reviewer privileges required"}), 403
         
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                SELECT r.id, r.annotation_id, r.reported_by, r.report_reason, r.reported_at,
-                       a.project, a.timestamp, a.peak_type, a.description, a.relevant_link
-                FROM annotation_reports r
-                JOIN peak_annotations a ON r.annotation_id = a.id
-                WHERE r.status = 'pending'
-                ORDER BY r.reported_at ASC
-                """
-            )
-            results = cursor.fetchall()
-            conn.close()
+            page_size = min(QUEUE_MAX_PAGE_SIZE, max(1, int(request.args.get('page_size', 50))))
+            cursor_value = request.args.get('cursor')
+            after = decode_queue_cursor(cursor_value) if cursor_value else None
+        except ValueError:
+            return jsonify({"error": "Invalid parameters"}), 400
+        
+        try:
+            reports, next_cursor = get_pending_reports_page(page_size, after)
             
-            reports = []
-            for row in results:
-                reports.append({
-                    "report_id": row[0],
-                    "annotation_id": row[1],
-                    "reported_by": row[2],
-                    "report_reason": row[3],
-                    "reported_at": row[4].isoformat() if row[4] else None,
-                    "annotation": {
-                        "project": row[5],
-                        "timestamp": row[6].isoformat() if row[6] else None,
-                        "peak_type": row[7],
-                        "description": row[8],
-                        "relevant_link": row[9]
-                    }
-                })
-            
-            return jsonify({"reports": reports}), 200
+            return jsonify({"reports": reports, "next_cursor": next_cursor}), 200
             
         except Exception as e:
             logger.error(f"Error fetching pending reports: {e}")
@@ -524,109 +722,92 @@ def create_annotation_blueprint(mwo_auth):
         if action not in ['dismiss', 'edit', 'remove']:
             return jsonify({"error": "Invalid action"}), 400
         
+        edited_description = None
+        edited_link = None
+        if action == 'edit':
+            edited_description = (data.get('edited_description') or '').strip()
+            edited_link = (data.get('edited_link') or '').strip() or None
+            
+            if not edited_description:
+                return jsonify({"error": "Edited description required"}), 400
+        
+        action_taken, audit_details, message = REPORT_ACTIONS[action]
+        
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get report details
-            cursor.execute(
-                """
-                SELECT annotation_id, status FROM annotation_reports WHERE id = %s
-                """,
-                (report_id,)
-            )
-            result = cursor.fetchone()
-            
-            if not result:
-                conn.close()
-                return jsonify({"error": "Report not found"}), 404
-            
-            annotation_id, report_status = result
-            
-            if report_status != 'pending':
-                conn.close()
-                return jsonify({"error": "Report already reviewed"}), 409
-            
-            if action == 'dismiss':
-                # Dismiss report, no action on annotation
-                cursor.execute(
-                    """
-                    UPDATE annotation_reports
-                    SET status = 'reviewed', reviewed_by = %s, 
-                        reviewed_at = %s, action_taken = 'no_action'
-                    WHERE id = %s
-                    """,
-                    (username, datetime.now(), report_id)
-                )
-                message = "Report dismissed"
-                
-            elif action == 'edit':
-                # Edit annotation
-                edited_description = data.get('edited_description', '').strip()
-                edited_link = data.get('edited_link', '').strip() or None
-                
-                if not edited_description:
-                    conn.close()
-                    return jsonify({"error": "Edited description required"}), 400
+            try:
+                conn.begin()
+                cursor = conn.cursor()
                 
+                # Lock the report so concurrent reviews of it serialize here
                 cursor.execute(
                     """
-                    UPDATE peak_annotations
-                    SET description = %s, relevant_link = %s
-                    WHERE id = %s
+                    SELECT annotation_id, status FROM annotation_reports WHERE id = %s
+                    FOR UPDATE
                     """,
-                    (edited_description, edited_link, annotation_id)
+                    (report_id,)
                 )
+                result = cursor.fetchone()
                 
-                cursor.execute(
-                    """
-                    UPDATE annotation_reports
-                    SET status = 'reviewed', reviewed_by = %s, 
-                        reviewed_at = %s, action_taken = 'edited'
-                    WHERE id = %s
-                    """,
-                    (username, datetime.now(), report_id)
-                )
+                if not result:
+                    conn.rollback()
+                    return jsonify({"error": "Report not found"}), 404
                 
-                log_annotation_action(
-                    annotation_id, 'report_action', username,
-                    f"Edited annotation based on report #{report_id}",
-                    request.remote_addr, request.headers.get('User-Agent')
-                )
+                annotation_id, report_status = result
                 
-                message = "Annotation edited"
+                if report_status != 'pending':
+                    conn.rollback()
+                    return jsonify({"error": "Report already reviewed"}), 409
                 
-            elif action == 'remove':
-                # Remove annotation (set invisible)
-                cursor.execute(
-                    """
-                    UPDATE peak_annotations
-                    SET is_visible = FALSE
-                    WHERE id = %s
-                    """,
-                    (annotation_id,)
-                )
+                if action == 'edit':
+                    cursor.execute(
+                        """
+                        UPDATE peak_annotations
+                        SET description = %s, relevant_link = %s
+                        WHERE id = %s
+                        """,
+                        (edited_description, edited_link, annotation_id)
+                    )
+                elif action == 'remove':
+                    # Remove annotation (set invisible)
+                    cursor.execute(
+                        """
+                        UPDATE peak_annotations
+                        SET is_visible = FALSE
+                        WHERE id = %s
+                        """,
+                        (annotation_id,)
+                    )
                 
                 cursor.execute(
                     """
                     UPDATE annotation_reports
                     SET status = 'reviewed', reviewed_by = %s, 
-                        reviewed_at = %s, action_taken = 'removed'
-                    WHERE id = %s
+                        reviewed_at = %s, action_taken = %s
+                    WHERE id = %s AND status = 'pending'
                     """,
-                    (username, datetime.now(), report_id)
+                    (username, datetime.now(), action_taken, report_id)
                 )
                 
-                log_annotation_action(
-                    annotation_id, 'report_action', username,
-                    f"Removed annotation based on report #{report_id}",
-                    request.remote_addr, request.headers.get('User-Agent')
-                )
+                # Dismissals leave the annotation untouched and are not audited
+                if audit_details:
+                    log_annotation_action(
+                        annotation_id, 'report_action', username,
+                        audit_details.format(report_id=report_id),
+                        request.remote_addr, request.headers.get('User-Agent'),
+                        cursor=cursor
+                    )
                 
-                message = "Annotation removed"
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
             
-            conn.commit()
-            conn.close()
+            invalidate_dashboard_cache()
+            if action != 'dismiss':
+                notify_annotations_changed()
             
             return jsonify({"success": True, "message": message}), 200
             
@@ -634,6 +815,171 @@ def create_annotation_blueprint(mwo_auth):
             logger.error(f"Error reviewing report: {e}")
             return jsonify({"error": "Failed to review report"}), 500
 
+    # --- Bulk Review Reports (Reviewers Only) ---
+    @annotation_bp.route('/reports/review/bulk', methods=['POST'])
+    def bulk_review_reports():
+        """
+        Review up to BULK_REVIEW_MAX_ITEMS reports in one transaction.
+        Body: {"reviews": [{"report_id", "action", "edited_description",
+                            "edited_link"}, ...]}
+        Returns one result per item; invalid or already reviewed items are
+        reported without affecting the others.
+        Requires: reviewer privileges
+        """
+        current_user = mwo_auth.get_current_user(True)
+        if not current_user:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        username = current_user
+        
+        if not is_reviewer(username):
+            return jsonify({"error": "Reviewer privileges required"}), 403
+        
+        reviews = (request.json or {}).get('reviews')
+        if not isinstance(reviews, list) or not reviews:
+            return jsonify({"error": "Missing required fields"}), 400
+        if len(reviews) > BULK_REVIEW_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_REVIEW_MAX_ITEMS} reviews per request"}), 400
+        
+        results, pending = _collect_bulk_items(reviews, 'report_id', REPORT_ACTIONS, False)
+        ip_address = request.remote_addr
+        user_agent = request.headers.get('User-Agent')
+        succeeded = 0
+        annotations_changed = False
+        
+        try:
+            if pending:
+                conn = get_db_connection()
+                try:
+                    conn.begin()
+                    cursor = conn.cursor()
+                    
+                    ids = list(pending)
+                    cursor.execute(
+                        f"""
+                        SELECT id, annotation_id, status
+                        FROM annotation_reports WHERE id IN ({_id_placeholders(len(ids))})
+                        FOR UPDATE
+                        """,
+                        ids
+                    )
+                    current = {row[0]: row[1:] for row in cursor.fetchall()}
+                    
+                    report_ids = {action_taken: [] for action_taken, _, _ in REPORT_ACTIONS.values()}
+                    removed_annotation_ids = []
+                    edits = []
+                    audit_rows = []
+                    
+                    for report_id, (index, action, edited_description, edited_link, _) in pending.items():
+                        row = current.get(report_id)
+                        if row is None:
+                            results[index] = {"report_id": report_id, "success": False, "error": "Report not found"}
+                            continue
+                        annotation_id, status = row
+                        if status != 'pending':
+                            results[index] = {"report_id": report_id, "success": False, "error": "Report already reviewed"}
+                            continue
+                        
+                        action_taken, audit_details, message = REPORT_ACTIONS[action]
+                        report_ids[action_taken].append(report_id)
+                        if action == 'edit':
+                            edits.append((edited_description, edited_link, annotation_id))
+                        elif action == 'remove':
+                            removed_annotation_ids.append(annotation_id)
+                        if audit_details:
+                            audit_rows.append((
+                                annotation_id, 'report_action', username,
+                                audit_details.format(report_id=report_id),
+                                ip_address, user_agent
+                            ))
+                        results[index] = {"report_id": report_id, "success": True, "message": message}
+                        succeeded += 1
+                    
+                    if edits:
+                        cursor.executemany(
+                            """
+                            UPDATE peak_annotations
+                            SET description = %s, relevant_link = %s
+                            WHERE id = %s
+                            """,
+                            edits
+                        )
+                    if removed_annotation_ids:
+                        cursor.execute(
+                            f"""
+                            UPDATE peak_annotations
+                            SET is_visible = FALSE
+                            WHERE id IN ({_id_placeholders(len(removed_annotation_ids))})
+                            """,
+                            removed_annotation_ids
+                        )
+                    
+                    now = datetime.now()
+                    for action_taken, ids_for_action in report_ids.items():
+                        if not ids_for_action:
+                            continue
+                        cursor.execute(
+                            f"""
+                            UPDATE annotation_reports
+                            SET status = 'reviewed', reviewed_by = %s, 
+                                reviewed_at = %s, action_taken = %s
+                            WHERE id IN ({_id_placeholders(len(ids_for_action))}) AND status = 'pending'
+                            """,
+                            [username, now, action_taken] + ids_for_action
+                        )
+                    log_annotation_actions(audit_rows, cursor=cursor)
+                    
+                    conn.commit()
+                    annotations_changed = bool(edits or removed_annotation_ids)
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.close()
+            
+            if succeeded:
+                invalidate_dashboard_cache()
+            if annotations_changed:
+                notify_annotations_changed()
+            
+            return jsonify({"results": results, "succeeded": succeeded}), 200
+            
+        except Exception as e:
+            logger.error(f"Error bulk reviewing reports: {e}")
+            return jsonify({"error": "Failed to review reports"}), 500
+
+    # --- Reviewer Dashboard (Reviewers Only) ---
+    @annotation_bp.route('/dashboard', methods=['GET'])
+    def get_dashboard():
+        """
+        Get pending counts and the first page of both review queues in one call.
+        Optional since_annotation_id / since_report_id return only newer items.
+        Requires: reviewer privileges
+        """
+        current_user = mwo_auth.get_current_user(True)
+        if not current_user:
+            return jsonify({"error": "Authentication required"}), 401
+        
+        username = current_user
+        
+        if not is_reviewer(username):
+            return jsonify({"error": "Reviewer privileges required"}), 403
+        
+        try:
+            page_size = min(QUEUE_MAX_PAGE_SIZE, max(1, int(request.args.get('page_size', 20))))
+            since_annotation_id = request.args.get('since_annotation_id', type=int)
+            since_report_id = request.args.get('since_report_id', type=int)
+        except ValueError:
+            return jsonify({"error": "Invalid parameters"}), 400
+        
+        try:
+            dashboard = get_reviewer_dashboard(page_size, since_annotation_id, since_report_id)
+            return jsonify(dashboard), 200
+            
+        except Exception as e:
+            logger.error(f"Error fetching reviewer dashboard: {e}")
+            return jsonify({"error": "Failed to fetch dashboard"}), 500
+
     # --- Get Review Stats (Reviewers Only) ---
     @annotation_bp.route('/stats', methods=['GET'])
     def get_review_stats():
@@ -702,9 +1048,9 @@ def create_annotation_blueprint(mwo_auth):
             else:
                 return jsonify({"error": "Unable to verify edit count"}), 500
         
-        if edit_count < 1000 and not is_reviewer(username):
+        if edit_count < MIN_EDIT_COUNT and not is_reviewer(username):
             return jsonify({
-                "error": f"Insufficient edit count. Required: 1000, Current: {edit_count}"
+                "error": f"Insufficient edit count. Required: {MIN_EDIT_COUNT}, Current: {edit_count}"
             }), 403
 
         try:
@@ -720,6 +1066,8 @@ def create_annotation_blueprint(mwo_auth):
                 conn.close()
                 return jsonify({"error": "Annotation not found"}), 404
 
+            # Connections autocommit; the update and its audit row commit together
+            conn.begin()
             # Update annotation
             cursor.execute(
                 """
@@ -729,7 +1077,6 @@ def create_annotation_blueprint(mwo_auth):
                 """,
                 (new_description, new_link, annotation_id)
             )
-            conn.commit()
 
             # Log the action
             log_annotation_action(
@@ -738,10 +1085,13 @@ def create_annotation_blueprint(mwo_auth):
                 username,
                 f"Edited annotation (universal edit)",
                 request.remote_addr,
-                request.headers.get('User-Agent')
+                request.headers.get('User-Agent'),
+                cursor=cursor
             )
-
+            conn.commit()
             conn.close()
+            invalidate_dashboard_cache()
+            notify_annotations_changed()
             return jsonify({"success": True, "message": "Annotation updated successfully"}), 200
         except Exception as e:
             logger.error(f"Error updating annotation: {e}")
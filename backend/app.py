@@ -1,17 +1,18 @@
 from flask import Flask, render_template, request, jsonify, redirect, session, send_from_directory	
 from datetime import datetime
 from flask_cors import CORS
-import requests
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.io import to_html
 import calendar
+import time
+import base64
+import json
 from flask_mwoauth import MWOAuth
 import os
 
 from dotenv import load_dotenv
-from utils import getHeader
 from config import get_db_connection
+from compression import init_compression, cached_response
+from cache_versions import get_cache_version, bump_cache_version
+from http_client import get_json
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 app = Flask(__name__, static_folder="../../static")
@@ -24,6 +25,8 @@ CORS(app,
      allow_headers=["Content-Type"],
      expose_headers=["Content-Type"])
 
+init_compression(app)
+
 load_dotenv()
 
 app.secret_key = os.getenv("SECRET_KEY")
@@ -50,10 +53,12 @@ auth_bp = create_auth_blueprint(mwo_auth)
 app.register_blueprint(auth_bp, url_prefix='/auth')
 
 from annotation.routes import create_annotation_blueprint
+from annotation.annotation_utils import get_annotations_for_range, on_annotations_changed, get_active_reviewers
 annotation_bp = create_annotation_blueprint(mwo_auth)
 app.register_blueprint(annotation_bp, url_prefix='/api/annotations')
 
 from subscription.routes import create_watchlist_blueprint
+from subscription.sitematrix_validator import warm_sitematrix_cache
 watchlist_bp = create_watchlist_blueprint(mwo_auth)
 app.register_blueprint(watchlist_bp, url_prefix='/api/watchlist')
 
@@ -69,13 +74,29 @@ def serve(path):
         return send_from_directory(app.static_folder, "index.html")
 
 
+# Chart data only changes when the monthly cron runs; SiteMatrix changes rarely
+CHART_CACHE_TTL = 600
+COMMUNITIES_CACHE_TTL = 3600
+
+# Label and annotation edits bump this shared version so that every worker,
+# not just the one handling the edit, drops its cached chart responses
+CHART_CACHE = "charts"
+
+
+def chart_cache_version():
+    return get_cache_version(CHART_CACHE)
+
+
 # --- Get communities list from SiteMatrix API ---
 @app.route("/api/communities")
+@cached_response(ttl=COMMUNITIES_CACHE_TTL)
 def get_all_communities():
     url = "https://commons.wikimedia.org/w/api.php?action=sitematrix&smtype=language&format=json"
 
-    response = requests.get(url, headers=getHeader())
-    data = response.json()
+    try:
+        data = get_json(url)
+    except Exception as e:
+        return jsonify({"error": f"SiteMatrix unavailable: {e}"}), 503
     sitematrix = data["sitematrix"]
 
     languages = {}
@@ -92,6 +113,8 @@ def get_all_communities():
 
 # --- Peak detection function ---
 def find_peaks_rolling_3_years(df, threshold_percentage=0.30):
+    import pandas as pd
+
     df = df.sort_values("timestamp").reset_index(drop=True)
     peaks = []
 
@@ -174,6 +197,7 @@ def update_peak_label():
             """,
                 (label, project, timestamp),
             )
+            bump_cache_version(CHART_CACHE, cursor=cursor)
             conn.commit()
             return jsonify({"success": True})
         except Exception as e:
@@ -208,8 +232,156 @@ def get_peak_label():
 
 # app.py
 
+def parse_month_range(datestart, dateend):
+    """Turn "Jan 2020" style bounds into the first and last second of the range."""
+    start = datetime.strptime(datestart, "%b %Y").replace(day=1)
+    end_dt = datetime.strptime(dateend, "%b %Y")
+    last_day = calendar.monthrange(end_dt.year, end_dt.month)[1]
+    end = end_dt.replace(day=last_day, hour=23, minute=59, second=59)
+    return start, end
+
+
+# --- Server-side downsampling for long chart ranges ---
+CHART_GRANULARITIES = {"month": None, "quarter": "QS", "year": "YS"}
+
+
+def parse_downsampling_args(args):
+    """Read the optional granularity / max_points chart parameters."""
+    granularity = args.get("granularity", "month")
+    if granularity not in CHART_GRANULARITIES:
+        raise ValueError("Invalid granularity")
+
+    max_points = args.get("max_points")
+    if max_points is not None:
+        try:
+            max_points = int(max_points)
+        except ValueError:
+            raise ValueError("Invalid max_points") from None
+        if max_points < 1:
+            raise ValueError("max_points must be positive")
+
+    return granularity, max_points
+
+
+def downsample_series(values, how, granularity="month", max_points=None):
+    """
+    Aggregate gap-filled monthly values (Series or DataFrame indexed by month)
+    into quarters or years, then merge consecutive buckets until at most
+    max_points remain. Buckets are labeled with their first timestamp.
+    """
+    import numpy as np
+
+    rule = CHART_GRANULARITIES[granularity]
+    if rule:
+        values = values.resample(rule).agg(how)
+
+    if max_points and len(values) > max_points:
+        step = -(-len(values) // max_points)
+        bucket_starts = values.index[::step]
+        values = values.groupby(np.arange(len(values)) // step).agg(how)
+        values.index = bucket_starts
+
+    return values.round().astype(int)
+
+
+def peak_buckets(bucket_index, peak_timestamps):
+    """Map peak timestamps onto the start of the downsampled bucket containing them."""
+    import pandas as pd
+
+    positions = bucket_index.searchsorted(pd.DatetimeIndex(peak_timestamps), side="right") - 1
+    return bucket_index[positions.clip(0)]
+
+
+def downsample_peak_markers(values, peak_timestamps, peak_labels):
+    """
+    Collapse peak markers onto downsampled buckets: one marker per bucket that
+    contains a peak, placed on the aggregated value and carrying its labels.
+    """
+    import pandas as pd
+
+    if not peak_timestamps:
+        return [], [], []
+
+    markers = pd.DataFrame({
+        "bucket": peak_buckets(values.index, peak_timestamps),
+        "label": peak_labels,
+    })
+    labels = markers.groupby("bucket")["label"].agg(lambda group: "; ".join(label for label in group if label))
+
+    return (
+        labels.index.strftime("%Y-%m-%d").tolist(),
+        values.loc[labels.index].tolist(),
+        labels.tolist(),
+    )
+
+
+# --- Compact chart payload (format=compact) ---
+COMPACT_MIMETYPE = "application/vnd.community-alerts.compact+json"
+
+
+def wants_compact_format():
+    """Compact chart payloads are selected with ?format=compact or the compact Accept type."""
+    if request.args.get("format") == "compact":
+        return True
+    return COMPACT_MIMETYPE in request.headers.get("Accept", "")
+
+
+def delta_encode(values):
+    """First value as-is, then differences to the previous value."""
+    import numpy as np
+
+    return np.diff(np.asarray(values, dtype=np.int64), prepend=0).tolist()
+
+
+def compact_axis(index):
+    """Describe a regular month-start index as its first month and step in months."""
+    step = 1
+    if len(index) > 1:
+        step = (index[1].year - index[0].year) * 12 + index[1].month - index[0].month
+    return {"start": index[0].strftime("%Y-%m"), "step": step}
+
+
+def wants_annotations():
+    """Chart responses embed approved annotations per peak with ?include_annotations=1."""
+    return request.args.get("include_annotations") in ("1", "true")
+
+
+def attach_annotations(peaks, annotations):
+    """Set each peak's "annotation" from a get_annotations_for_range() result."""
+    for peak in peaks:
+        peak["annotation"] = annotations.get(peak["timestamp"][:10])
+
+
+def compact_chart_response(line_values, peaks, peak_timestamps, peak_labels):
+    """
+    Compact variant of the single-project chart payload. The line is a start
+    month, a step in months and delta-encoded integers; peak markers are
+    positions into that series and peak rows are columnar. Trace styling is
+    left to the frontend.
+    """
+    import pandas as pd
+
+    if line_values is None:
+        return jsonify({"format": "compact", "series": None, "peakMarkers": None, "peaks": {}})
+
+    index = line_values.index
+    positions = []
+    if peak_timestamps:
+        positions = (index.searchsorted(pd.DatetimeIndex(peak_timestamps), side="right") - 1).tolist()
+
+    return jsonify({
+        "format": "compact",
+        "series": {**compact_axis(index), "deltas": delta_encode(line_values)},
+        "peakMarkers": {"index": positions, "text": peak_labels},
+        "peaks": {key: [peak[key] for peak in peaks] for key in (peaks[0] if peaks else {})},
+    })
+
+
 @app.route("/api/activity-data")
+@cached_response(ttl=CHART_CACHE_TTL, version=chart_cache_version)
 def get_activity_data():
+    import pandas as pd
+
     language = request.args.get("language")
     project_group = request.args.get("project_group")
     datestart = request.args.get("datestart")
@@ -219,10 +391,15 @@ def get_activity_data():
         return jsonify({"error": "Missing required parameters"}), 400
 
     project = project_group
-    start = datetime.strptime(datestart, "%b %Y").replace(day=1)
-    end_dt = datetime.strptime(dateend, "%b %Y")
-    last_day = calendar.monthrange(end_dt.year, end_dt.month)[1]
-    end = end_dt.replace(day=last_day, hour=23, minute=59, second=59)
+    start, end = parse_month_range(datestart, dateend)
+
+    try:
+        granularity, max_points = parse_downsampling_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    downsampled = granularity != "month" or max_points is not None
+    compact = wants_compact_format()
+    include_annotations = wants_annotations()
 
     try:
         conn = get_db_connection()
@@ -241,13 +418,20 @@ def get_activity_data():
             SELECT timestamp, edit_count AS edits, rolling_mean, threshold, percentage_difference, label
             FROM community_alerts
             WHERE project = %s AND timestamp BETWEEN %s AND %s
+            AND is_stale = FALSE
             ORDER BY timestamp ASC
         """
         df_peaks = pd.read_sql(query_peaks, conn, params=(project, start, end))
+
+        annotations = None
+        if include_annotations:
+            annotations = get_annotations_for_range(project, "edit", start, end, conn=conn)
         
         conn.close()
 
         if df_edits.empty:
+            if compact:
+                return compact_chart_response(None, [], [], [])
             return jsonify({"peaks": [], "chartData": {}})
 
         # Format Chart Data
@@ -258,6 +442,9 @@ def get_activity_data():
 
         # Reindex and fill missing months with 0
         df_edits = df_edits.reindex(full_range, fill_value=0)
+        if downsampled:
+            df_edits = downsample_series(df_edits, "sum", granularity, max_points)
+        line_values = df_edits["edits"]
         df_edits = df_edits.rename_axis("timestamp").reset_index()
         chart_timestamps = df_edits["timestamp"].dt.strftime('%Y-%m-%d').tolist()
         chart_edits = df_edits["edits"].tolist()
@@ -287,6 +474,17 @@ def get_activity_data():
                 label_value = row["label"] if pd.notna(row["label"]) else ""
                 peak_labels_chart.append(label_value)
 
+        if annotations is not None:
+            attach_annotations(peaks, annotations)
+
+        if downsampled:
+            peak_timestamps_chart, peak_values_chart, peak_labels_chart = downsample_peak_markers(
+                line_values, peak_timestamps_chart, peak_labels_chart
+            )
+
+        if compact:
+            return compact_chart_response(line_values, peaks, peak_timestamps_chart, peak_labels_chart)
+
         response_data = {
             "peaks": peaks,
             "chartData": {
@@ -316,9 +514,13 @@ def get_activity_data():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
 # --- Editor Counts API Endpoints ---
 @app.route("/api/editor-activity-data")
+@cached_response(ttl=CHART_CACHE_TTL, version=chart_cache_version)
 def get_editor_activity_data():
+    import pandas as pd
+
     language = request.args.get("language")
     project_group = request.args.get("project_group")
     datestart = request.args.get("datestart")
@@ -329,10 +531,15 @@ def get_editor_activity_data():
 
     project = project_group
 
-    start = datetime.strptime(datestart, "%b %Y").replace(day=1)
-    end_dt = datetime.strptime(dateend, "%b %Y")
-    last_day = calendar.monthrange(end_dt.year, end_dt.month)[1]
-    end = end_dt.replace(day=last_day, hour=23, minute=59, second=59)
+    start, end = parse_month_range(datestart, dateend)
+
+    try:
+        granularity, max_points = parse_downsampling_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    downsampled = granularity != "month" or max_points is not None
+    compact = wants_compact_format()
+    include_annotations = wants_annotations()
 
     try:
         conn = get_db_connection()
@@ -360,6 +567,7 @@ def get_editor_activity_data():
             FROM editor_alerts
             WHERE (project = %s OR project = %s)
             AND timestamp BETWEEN %s AND %s
+            AND is_stale = FALSE
             ORDER BY timestamp ASC
         """
 
@@ -368,9 +576,15 @@ def get_editor_activity_data():
             params=(project, project_without_org, start, end)
         )
 
+        annotations = None
+        if include_annotations:
+            annotations = get_annotations_for_range(project, "editor", start, end, conn=conn)
+
         conn.close()
 
         if df_editors.empty:
+            if compact:
+                return compact_chart_response(None, [], [], [])
             return jsonify({"peaks": [], "chartData": {}})
 
         df_editors["timestamp"] = pd.to_datetime(df_editors["timestamp"])
@@ -379,6 +593,9 @@ def get_editor_activity_data():
         full_range = pd.date_range(start=start, end=end, freq='MS')
 
         df_editors = df_editors.reindex(full_range, fill_value=0)
+        if downsampled:
+            df_editors = downsample_series(df_editors, "mean", granularity, max_points)
+        line_values = df_editors["editors"]
         df_editors = df_editors.rename_axis("timestamp").reset_index()
 
         chart_timestamps = df_editors["timestamp"].dt.strftime('%Y-%m-%d').tolist()
@@ -409,6 +626,17 @@ def get_editor_activity_data():
                 label_value = row["label"] if pd.notna(row["label"]) else ""
                 peak_labels_chart.append(label_value)
 
+        if annotations is not None:
+            attach_annotations(peaks, annotations)
+
+        if downsampled:
+            peak_timestamps_chart, peak_values_chart, peak_labels_chart = downsample_peak_markers(
+                line_values, peak_timestamps_chart, peak_labels_chart
+            )
+
+        if compact:
+            return compact_chart_response(line_values, peaks, peak_timestamps_chart, peak_labels_chart)
+
         response_data = {
             "peaks": peaks,
             "chartData": {
@@ -437,6 +665,176 @@ def get_editor_activity_data():
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@on_annotations_changed
+def clear_annotated_chart_caches():
+    """Chart responses may embed annotations, so drop them when annotations change."""
+    bump_cache_version(CHART_CACHE)
+
+
+# --- Batch chart data for comparing projects ---
+# (counts table, value column, alerts table, aggregation used when downsampling)
+CHART_METRICS = {
+    "edit": ("edit_counts", "edit_count", "community_alerts", "sum"),
+    "editor": ("editor_counts", "editor_count", "editor_alerts", "mean"),
+}
+BATCH_MAX_PROJECTS = 50
+
+
+@app.route("/api/activity-data/batch")
+@cached_response(ttl=CHART_CACHE_TTL, version=chart_cache_version)
+def get_batch_activity_data():
+    """
+    Chart data for several projects and metrics in one request.
+
+    projects and metrics are comma-separated lists. Every series shares one
+    gap-filled "x" axis (monthly unless granularity / max_points downsample it);
+    a series is null when the project has no data.
+    """
+    import pandas as pd
+
+    projects = [p.strip() for p in request.args.get("projects", "").split(",") if p.strip()]
+    metrics = [m.strip() for m in request.args.get("metrics", "edit").split(",") if m.strip()]
+    datestart = request.args.get("datestart")
+    dateend = request.args.get("dateend")
+
+    if not (projects and metrics and datestart and dateend):
+        return jsonify({"error": "Missing required parameters"}), 400
+
+    if len(projects) > BATCH_MAX_PROJECTS:
+        return jsonify({"error": f"Too many projects (maximum {BATCH_MAX_PROJECTS})"}), 400
+
+    if any(metric not in CHART_METRICS for metric in metrics):
+        return jsonify({"error": "Invalid metric"}), 400
+
+    projects = list(dict.fromkeys(projects))
+    metrics = list(dict.fromkeys(metrics))
+    start, end = parse_month_range(datestart, dateend)
+
+    try:
+        granularity, max_points = parse_downsampling_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    downsampled = granularity != "month" or max_points is not None
+    compact = wants_compact_format()
+
+    # editor_counts may store projects without the ".org" suffix
+    aliases = {project: project for project in projects}
+    for project in projects:
+        if project.endswith(".org"):
+            aliases.setdefault(project[:-len(".org")], project)
+    placeholders = ", ".join(["%s"] * len(aliases))
+
+    full_range = pd.date_range(start=start, end=end, freq="MS")
+    x_axis = full_range
+    series = {project: {} for project in projects}
+
+    try:
+        conn = get_db_connection()
+
+        for metric in metrics:
+            counts_table, value_column, alerts_table, how = CHART_METRICS[metric]
+
+            df_counts = pd.read_sql(
+                f"""
+                SELECT project, timestamp, {value_column} AS value
+                FROM {counts_table}
+                WHERE project IN ({placeholders}) AND timestamp BETWEEN %s AND %s
+            """,
+                conn, params=(*aliases, start, end)
+            )
+            df_peaks = pd.read_sql(
+                f"""
+                SELECT project, timestamp, {value_column} AS value, percentage_difference, label
+                FROM {alerts_table}
+                WHERE project IN ({placeholders}) AND timestamp BETWEEN %s AND %s
+                AND is_stale = FALSE
+                ORDER BY timestamp ASC
+            """,
+                conn, params=(*aliases, start, end)
+            )
+
+            # Gap-fill every project's series in one reindex
+            values = pd.DataFrame(index=full_range)
+            if not df_counts.empty:
+                df_counts["project"] = df_counts["project"].map(aliases)
+                df_counts["timestamp"] = pd.to_datetime(df_counts["timestamp"])
+                values = (
+                    df_counts.pivot_table(index="timestamp", columns="project", values="value", aggfunc="max")
+                    .reindex(full_range)
+                    .fillna(0)
+                    .astype(int)
+                )
+            if downsampled:
+                values = downsample_series(values, how, granularity, max_points)
+            x_axis = values.index
+
+            peaks_by_project = {}
+            if not df_peaks.empty:
+                df_peaks["project"] = df_peaks["project"].map(aliases)
+                df_peaks["timestamp"] = pd.to_datetime(df_peaks["timestamp"]).dt.to_period("M").dt.to_timestamp()
+                df_peaks["label"] = df_peaks["label"].fillna("")
+                df_peaks["percentage_difference"] = df_peaks["percentage_difference"].astype(float).round(2)
+                if downsampled:
+                    # One marker per project and bucket, placed on the aggregated value
+                    df_peaks["timestamp"] = peak_buckets(values.index, df_peaks["timestamp"])
+                    df_peaks = df_peaks.groupby(["project", "timestamp"], as_index=False).agg(
+                        percentage_difference=("percentage_difference", "max"),
+                        label=("label", lambda group: "; ".join(label for label in group if label)),
+                    )
+                    df_peaks["value"] = [
+                        values.at[timestamp, project] if project in values.columns else 0
+                        for project, timestamp in zip(df_peaks["project"], df_peaks["timestamp"])
+                    ]
+                if compact:
+                    df_peaks["position"] = x_axis.searchsorted(pd.DatetimeIndex(df_peaks["timestamp"]))
+                df_peaks["timestamp"] = df_peaks["timestamp"].dt.strftime("%Y-%m-%d")
+                for project, group in df_peaks.groupby("project"):
+                    if compact:
+                        peaks_by_project[project] = {
+                            "index": group["position"].tolist(),
+                            "percentage_difference": group["percentage_difference"].tolist(),
+                            "text": group["label"].tolist(),
+                        }
+                        continue
+                    peaks_by_project[project] = {
+                        "x": group["timestamp"].tolist(),
+                        "y": group["value"].astype(int).tolist(),
+                        "percentage_difference": group["percentage_difference"].tolist(),
+                        "text": group["label"].tolist(),
+                    }
+
+            for project in projects:
+                if project not in values.columns:
+                    series[project][metric] = None
+                    continue
+                if compact:
+                    series[project][metric] = {
+                        "deltas": delta_encode(values[project]),
+                        "peaks": peaks_by_project.get(project, {"index": [], "percentage_difference": [], "text": []}),
+                    }
+                    continue
+                series[project][metric] = {
+                    "y": values[project].tolist(),
+                    "peaks": peaks_by_project.get(project, {"x": [], "y": [], "percentage_difference": [], "text": []}),
+                }
+
+        conn.close()
+
+        if compact:
+            return jsonify({"format": "compact", "x": compact_axis(x_axis), "metrics": metrics, "series": series})
+
+        return jsonify({
+            "x": x_axis.strftime("%Y-%m-%d").tolist(),
+            "metrics": metrics,
+            "series": series,
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # --- Editor Peak Label Management ---
 @app.route("/api/update_editor_peak_label", methods=["POST"])
 def update_editor_peak_label():
@@ -457,6 +855,7 @@ def update_editor_peak_label():
             """,
                 (label, project, timestamp),
             )
+            bump_cache_version(CHART_CACHE, cursor=cursor)
             conn.commit()
             return jsonify({"success": True})
         except Exception as e:
@@ -489,5 +888,218 @@ def get_editor_peak_label():
         conn.close()
 
 
+
+# --- Cross-project peak summary ---
+SUMMARY_SORT_COLUMNS = {
+    "latest_peak": "latest_peak_timestamp",
+    "peak_count": "peak_count",
+    "max_percentage_difference": "max_percentage_difference",
+    "last_month_value": "last_month_value",
+}
+SUMMARY_MAX_PER_PAGE = 100
+
+
+@app.route("/api/peaks/summary", methods=["GET"])
+def get_peaks_summary():
+    metric = request.args.get("metric", "edit")
+    sort = request.args.get("sort", "latest_peak")
+    order = request.args.get("order", "desc").lower()
+
+    if metric not in ("edit", "editor"):
+        return jsonify({"error": "Invalid metric"}), 400
+    if sort not in SUMMARY_SORT_COLUMNS:
+        return jsonify({"error": "Invalid sort column"}), 400
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "Invalid sort order"}), 400
+
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+        per_page = min(SUMMARY_MAX_PER_PAGE, max(1, int(request.args.get("per_page", 25))))
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
+
+    sort_column = SUMMARY_SORT_COLUMNS[sort]
+    direction = order.upper()
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT COUNT(*) FROM peak_summary WHERE metric = %s", (metric,))
+        total = cursor.fetchone()[0]
+
+        # The inner query walks the (metric, sort column, project) index only;
+        # full rows are fetched for the requested page alone.
+        cursor.execute(
+            f"""
+            SELECT s.project, s.latest_peak_timestamp, s.latest_peak_value, s.peak_count,
+                   s.max_percentage_difference, s.last_month_timestamp, s.last_month_value
+            FROM peak_summary s
+            JOIN (
+                SELECT project FROM peak_summary
+                WHERE metric = %s
+                ORDER BY {sort_column} {direction}, project {direction}
+                LIMIT %s OFFSET %s
+            ) page ON page.project = s.project
+            WHERE s.metric = %s
+            ORDER BY s.{sort_column} {direction}, s.project {direction}
+        """,
+            (metric, per_page, (page - 1) * per_page, metric),
+        )
+
+        summary = []
+        for row in cursor.fetchall():
+            summary.append({
+                "project": row[0],
+                "latest_peak_timestamp": row[1].strftime("%Y-%m-%d") if row[1] else None,
+                "latest_peak_value": row[2],
+                "peak_count": row[3],
+                "max_percentage_difference": round(float(row[4]), 2) if row[4] is not None else None,
+                "last_month_timestamp": row[5].strftime("%Y-%m-%d") if row[5] else None,
+                "last_month_value": row[6],
+            })
+
+        return jsonify({
+            "metric": metric,
+            "sort": sort,
+            "order": order,
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "summary": summary,
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        conn.close()
+
+
+# --- Cross-project recent peaks feed ---
+RECENT_PEAK_TABLES = {
+    "edit": ("community_alerts", "edit_count"),
+    "editor": ("editor_alerts", "editor_count"),
+}
+RECENT_MAX_PER_PAGE = 100
+
+
+def encode_feed_cursor(timestamp, project, peak_type):
+    raw = json.dumps([timestamp.strftime("%Y-%m-%d %H:%M:%S"), project, peak_type])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_feed_cursor(cursor_value):
+    timestamp, project, peak_type = json.loads(base64.urlsafe_b64decode(cursor_value.encode()))
+    if peak_type not in RECENT_PEAK_TABLES:
+        raise ValueError("Invalid cursor peak type")
+    return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S"), project, peak_type
+
+
+@app.route("/api/peaks/recent", methods=["GET"])
+def get_recent_peaks():
+    """
+    Keyset-paginated feed of edit and editor peaks across all projects,
+    newest first. Ordered by (timestamp, project, peak_type) descending.
+    """
+    metric = request.args.get("metric", "both")
+    language = request.args.get("language")
+    family = request.args.get("family")
+    cursor_value = request.args.get("cursor")
+
+    if metric not in ("edit", "editor", "both"):
+        return jsonify({"error": "Invalid metric"}), 400
+
+    try:
+        per_page = min(RECENT_MAX_PER_PAGE, max(1, int(request.args.get("per_page", 25))))
+    except ValueError:
+        return jsonify({"error": "Invalid per_page"}), 400
+
+    after = None
+    if cursor_value:
+        try:
+            after = decode_feed_cursor(cursor_value)
+        except Exception:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    peak_types = ["edit", "editor"] if metric == "both" else [metric]
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        items = []
+        for peak_type in peak_types:
+            table, value_column = RECENT_PEAK_TABLES[peak_type]
+            conditions = ["is_stale = FALSE"]
+            params = []
+
+            # Filters are evaluated on the (is_stale, timestamp, project) index entries
+            if language:
+                conditions.append("SUBSTRING_INDEX(project, '.', 1) = %s")
+                params.append(language.strip().lower())
+            if family:
+                conditions.append("SUBSTRING_INDEX(SUBSTRING_INDEX(project, '.', 2), '.', -1) = %s")
+                params.append(family.strip().lower())
+
+            if after:
+                after_timestamp, after_project, after_type = after
+                # Same (timestamp, project) is only still ahead of the cursor for a lower peak_type
+                project_op = "<=" if peak_type < after_type else "<"
+                conditions.append(f"(timestamp < %s OR (timestamp = %s AND project {project_op} %s))")
+                params.extend([after_timestamp, after_timestamp, after_project])
+
+            cursor.execute(
+                f"""
+                SELECT project, timestamp, {value_column}, rolling_mean, threshold,
+                       percentage_difference, label
+                FROM {table}
+                WHERE {" AND ".join(conditions)}
+                ORDER BY timestamp DESC, project DESC
+                LIMIT %s
+            """,
+                params + [per_page + 1],
+            )
+
+            for row in cursor.fetchall():
+                items.append({
+                    "project": row[0],
+                    "timestamp": row[1],
+                    "peak_type": peak_type,
+                    "value": int(row[2]),
+                    "rolling_mean": round(float(row[3]), 2),
+                    "threshold": round(float(row[4]), 2),
+                    "percentage_difference": round(float(row[5]), 2),
+                    "label": row[6] or "",
+                })
+
+        items.sort(key=lambda item: (item["timestamp"], item["project"], item["peak_type"]), reverse=True)
+        has_more = len(items) > per_page
+        items = items[:per_page]
+
+        next_cursor = None
+        if has_more:
+            last = items[-1]
+            next_cursor = encode_feed_cursor(last["timestamp"], last["project"], last["peak_type"])
+
+        for item in items:
+            item["timestamp"] = item["timestamp"].strftime("%Y-%m-%d")
+
+        return jsonify({"peaks": items, "next_cursor": next_cursor})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        conn.close()
+
+
+def warm_caches():
+    """
+    Load the shared SiteMatrix snapshot and reviewer allowlist so the first
+    requests of a worker do not pay for them. Called from gunicorn.conf.py.
+    """
+    started = time.time()
+    warm_sitematrix_cache()
+    get_active_reviewers()
+    app.logger.info(f"Caches warmed in {time.time() - started:.2f}s")
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,70 @@
+import time
+import logging
+import threading
+from config import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# How long a worker trusts the version it last read before asking the DB again,
+# i.e. the longest another worker may serve entries that were invalidated
+VERSION_CHECK_SECONDS = 5
+
+# name -> (version, checked_at)
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def get_cache_version(name):
+    """
+    Return the shared version of a cache, re-read from cache_versions at most
+    every VERSION_CHECK_SECONDS. Falls back to the last known value (or 0)
+    when the DB cannot be reached.
+    """
+    now = time.time()
+    entry = _versions.get(name)
+    if entry is not None and now - entry[1] < VERSION_CHECK_SECONDS:
+        return entry[0]
+
+    try:
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+            row = cursor.fetchone()
+            version = row[0] if row else 0
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"Error reading cache version {name}: {e}")
+        version = entry[0] if entry is not None else 0
+
+    with _versions_lock:
+        _versions[name] = (version, now)
+    return version
+
+
+def bump_cache_version(name, cursor=None):
+    """
+    Invalidate a cache in every worker. Pass cursor to bump inside the
+    caller's transaction, otherwise the bump is committed on its own.
+    """
+    sql = """
+        INSERT INTO cache_versions (name, version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """
+    if cursor is not None:
+        cursor.execute(sql, (name,))
+    else:
+        try:
+            conn = get_db_connection()
+            try:
+                conn.cursor().execute(sql, (name,))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Error bumping cache version {name}: {e}")
+
+    # This worker sees its own write immediately
+    with _versions_lock:
+        _versions.pop(name, None)
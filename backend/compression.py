@@ -0,0 +1,153 @@
+import gzip
+import time
+import logging
+import threading
+from functools import wraps
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_SIZE = 1024
+CACHE_MAX_ENTRIES = 256
+
+
+def is_json_mimetype(mimetype):
+    return mimetype == "application/json" or (mimetype or "").endswith("+json")
+
+
+def supported_encodings():
+    return ["br", "gzip"] if brotli else ["gzip"]
+
+
+def negotiate_encoding():
+    """Pick the best Content-Encoding the client accepts, or None for identity."""
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_response(response):
+    """after_request hook: compress JSON responses above COMPRESSION_MIN_SIZE."""
+    if (
+        response.status_code < 200
+        or response.status_code >= 300
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not is_json_mimetype(response.mimetype)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
+
+
+class PrecompressedCache:
+    """
+    Small in-process TTL cache of response bodies. Each entry stores the body
+    once per supported encoding, so compression runs once per cache fill
+    instead of once per request.
+    """
+
+    def __init__(self, ttl, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry and entry["expires_at"] > time.time():
+            return entry
+        return None
+
+    def put(self, key, response):
+        data = response.get_data()
+        bodies = {None: data}
+        if len(data) >= COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                bodies[encoding] = compress(data, encoding)
+
+        entry = {
+            "bodies": bodies,
+            "mimetype": response.mimetype,
+            "expires_at": time.time() + self.ttl,
+        }
+        with self.lock:
+            self.entries.pop(key, None)
+            if len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[key] = entry
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def serve_cached_entry(entry):
+    encoding = negotiate_encoding()
+    if encoding not in entry["bodies"]:
+        encoding = None
+
+    response = current_app.response_class(entry["bodies"][encoding], mimetype=entry["mimetype"])
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def cached_response(ttl, version=None):
+    """
+    Cache successful responses of a GET view for ttl seconds, keyed by the full
+    request path and Accept header, and serve them precompressed.
+
+    The cache lives in each worker process. version is an optional callable
+    returning a shared token (see cache_versions): when it changes, this
+    worker drops its entries, so an invalidation reaches every worker.
+    """
+    def decorator(view):
+        cache = PrecompressedCache(ttl)
+        seen = {"version": None}
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            current = version() if version is not None else None
+            if current != seen["version"]:
+                cache.clear()
+                seen["version"] = current
+            key = (current, request.full_path, request.headers.get("Accept", ""))
+            entry = cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = cache.put(key, response)
+            return serve_cached_entry(entry)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
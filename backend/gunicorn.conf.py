@@ -0,0 +1,55 @@
+# Production serving profile: gunicorn -c gunicorn.conf.py app:app
+#
+# The default gthread workers keep a pool of threads per process, so a request
+# waiting on a Wikimedia API only holds one thread. Set GUNICORN_WORKER_CLASS=gevent
+# to run greenlet workers instead; requests and PyMySQL are pure Python and become
+# cooperative under gevent's monkey patching. Outbound calls are bounded by the
+# timeouts and circuit breakers in http_client.py, which stay below `timeout`.
+import os
+import multiprocessing
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv("GUNICORN_THREADS", 8))  # gthread only
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 200))  # gevent only
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+# Import the app once in the master and fork workers from it: workers boot
+# without re-importing and share those pages copy-on-write. app.py defers
+# pandas/numpy to the chart endpoints, so a preloading master imports them
+# in when_ready to share them too. gevent must monkey-patch before the app is
+# imported, so it loads per worker and pays for pandas on the first chart request.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1" if worker_class == "gthread" else "0") == "1"
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # With preload_app the warmed caches are inherited by every worker
+    if preload_app:
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+        from app import warm_caches
+        warm_caches()
+
+
+def post_fork(server, worker):
+    # Sockets opened in the master must not be shared between workers
+    from http_client import close_connections
+    close_connections()
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        from app import warm_caches
+        warm_caches()
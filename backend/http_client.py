@@ -0,0 +1,101 @@
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from utils import getHeader
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds; keep these well below the worker timeout
+DEFAULT_TIMEOUT = (3.05, 10)
+
+
+class CircuitOpenError(Exception):
+    """Raised when calls to a host are short-circuited after repeated failures."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for
+    reset_timeout seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at >= self.reset_timeout and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.opened_at = time.time()
+
+
+_session = requests.Session()
+_session.headers.update(getHeader())
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def close_connections():
+    """Drop pooled connections, e.g. in a worker forked from a process that used them."""
+    _session.close()
+
+
+def get_breaker(name):
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def get_json(url, params=None, timeout=DEFAULT_TIMEOUT, breaker=None):
+    """
+    GET a JSON document through the shared pooled session.
+
+    Every call has a timeout, and calls go through a per-host circuit breaker
+    so a stalled Wikimedia API fails fast instead of tying up workers.
+    Raises CircuitOpenError or the underlying requests exception.
+    """
+    breaker = breaker or get_breaker(urlparse(url).netloc)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {breaker.name}")
+
+    try:
+        response = _session.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+    except Exception:
+        breaker.record_failure()
+        raise
+
+    breaker.record_success()
+    return data
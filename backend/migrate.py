@@ -24,6 +24,11 @@ def run_sql_file(cursor, filepath):
     with open(filepath, 'r') as f:
         sql_content = f.read()
     
+    # Drop "--" comment lines first so a semicolon in a comment cannot split a statement
+    sql_content = "\n".join(
+        line for line in sql_content.splitlines() if not line.lstrip().startswith('--')
+    )
+    
     # Simple split by semicolon to handle multiple statements
     statements = sql_content.split(';')
     for statement in statements:
@@ -0,0 +1,9 @@
+-- Migration 004: Stale alert reconciliation
+-- Peaks that are no longer detected after a data correction are deleted by the
+-- alert jobs, unless they carry a label. Those are kept and flagged as stale.
+
+ALTER TABLE community_alerts
+    ADD COLUMN IF NOT EXISTS is_stale BOOLEAN NOT NULL DEFAULT FALSE;
+
+ALTER TABLE editor_alerts
+    ADD COLUMN IF NOT EXISTS is_stale BOOLEAN NOT NULL DEFAULT FALSE;
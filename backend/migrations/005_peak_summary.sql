@@ -0,0 +1,20 @@
+-- Migration 005: Materialized per-project peak summary
+-- Maintained by the alert jobs and read by /api/peaks/summary. Each sort column has a
+-- (metric, column, project) index so a page is resolved from the index alone.
+
+CREATE TABLE IF NOT EXISTS peak_summary (
+    project VARCHAR(255) NOT NULL,
+    metric ENUM('edit', 'editor') NOT NULL,
+    latest_peak_timestamp DATETIME DEFAULT NULL,
+    latest_peak_value INT DEFAULT NULL,
+    peak_count INT NOT NULL DEFAULT 0,
+    max_percentage_difference FLOAT DEFAULT NULL,
+    last_month_timestamp DATETIME DEFAULT NULL,
+    last_month_value INT DEFAULT NULL,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (project, metric),
+    INDEX idx_metric_latest_peak (metric, latest_peak_timestamp, project),
+    INDEX idx_metric_peak_count (metric, peak_count, project),
+    INDEX idx_metric_max_pct (metric, max_percentage_difference, project),
+    INDEX idx_metric_last_month (metric, last_month_value, project)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Per-project peak summary for cross-project dashboards';
@@ -0,0 +1,9 @@
+-- Migration 006: Secondary indexes for timestamp-ordered peak scans
+-- The primary keys lead with project, so "recent peaks across all projects"
+-- (/api/peaks/recent and the notification peak scan) needs a timestamp-led index.
+
+ALTER TABLE community_alerts
+    ADD INDEX IF NOT EXISTS idx_stale_timestamp_project (is_stale, timestamp, project);
+
+ALTER TABLE editor_alerts
+    ADD INDEX IF NOT EXISTS idx_stale_timestamp_project (is_stale, timestamp, project);
@@ -0,0 +1,10 @@
+-- Migration 007: Cached global edit counts
+-- Backs the in-process edit count cache used for annotation eligibility checks.
+-- A NULL edit_count records a user that globaluserinfo does not know (negative cache).
+
+CREATE TABLE IF NOT EXISTS user_edit_counts (
+    username VARCHAR(255) NOT NULL PRIMARY KEY,
+    edit_count INT DEFAULT NULL,
+    fetched_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_fetched_at (fetched_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,9 @@
+-- Migration 008: Composite indexes for the keyset-paginated review queues
+-- /pending and /reports/pending page through pending rows ordered by
+-- (submitted_at, id) / (reported_at, id). These indexes make each page a range scan.
+
+ALTER TABLE peak_annotations
+    ADD INDEX IF NOT EXISTS idx_status_submitted_id (status, submitted_at, id);
+
+ALTER TABLE annotation_reports
+    ADD INDEX IF NOT EXISTS idx_status_reported_id (status, reported_at, id);
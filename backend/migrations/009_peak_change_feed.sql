@@ -0,0 +1,22 @@
+-- Migration 009: Append-only change feed of newly detected peaks
+-- The alert jobs append one row per peak they insert for the first time, in the
+-- same transaction as the insert. Consumers (the notification job) remember the
+-- last event id they processed in peak_event_offsets instead of rescanning the alert tables.
+-- is_backfill marks peaks that were already old when they were first detected
+-- (historical data loaded later). Those are not notified.
+
+CREATE TABLE IF NOT EXISTS peak_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    project VARCHAR(255) NOT NULL,
+    timestamp DATETIME NOT NULL,
+    peak_type ENUM('edit', 'editor') NOT NULL,
+    is_backfill BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_project_timestamp (project, timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Newly created peaks, consumed by offset';
+
+CREATE TABLE IF NOT EXISTS peak_event_offsets (
+    consumer VARCHAR(64) NOT NULL PRIMARY KEY,
+    last_event_id BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Last processed peak_events id per consumer';
@@ -0,0 +1,9 @@
+-- Migration 010: Shared version counters for the in-process response caches
+-- Every gunicorn worker keeps its own cache, so a write bumps the named
+-- version here and each worker drops its entries once it sees the new value.
+
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='Cross-worker cache invalidation counters';
@@ -1,12 +1,87 @@
 import requests
 import logging
 import os
+from string import Template
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Digest templates are compiled once at import. The greeting is the only
+# per-recipient part, so a digest body is rendered once and shared by every
+# user watching the same set of peaks.
+DIGEST_GREETING = Template("Hello ${username},\n\n")
+
+DIGEST_INTRO = Template("""${count} significant activity ${peaks_have} been detected in projects you are subscribed to:
+
+""")
+
+DIGEST_SECTION = Template("\n━━━ ${title} (${count}) ━━━\n\n")
+
+DIGEST_PEAK = Template("""${index}. ${project}
+   • Date: ${date}
+   • ${unit}: ${value}
+   • Increase: +${increase}% (baseline: ${baseline})
+
+""")
+
+DIGEST_FOOTER = """
+
+These represent notable increases in community activity. You may want to investigate these spikes and consider adding annotations to help document what caused these increases.
+
+Visit the Community Activity Alerts dashboard to view more details and add annotations:
+https://community-activity-alerts.toolforge.org/
+
+To manage your notification preferences, visit your subscription settings in the dashboard.
+
+---
+This is an automated notification from the Community Activity Alerts tool.
+"""
+
+# peak_type -> (section title, value label), in the order sections appear
+DIGEST_SECTIONS = (
+    ('edit', 'Edit Count Peaks', 'Edits'),
+    ('editor', 'Editor Count Peaks', 'Editors'),
+)
+
+
+def peak_digest_key(peaks):
+    """Fingerprint of a peak list: users with equal keys receive the same digest."""
+    return frozenset((peak['project'], peak['timestamp'], peak['peak_type']) for peak in peaks)
+
+
+def render_peak_digest(peaks):
+    """
+    Render the recipient-independent part of a batched notification.
+    Returns (subject, body); prefix the body with DIGEST_GREETING per recipient.
+    """
+    count = len(peaks)
+    sorted_peaks = sorted(peaks, key=lambda x: (-(x.get('percentage_difference') or 0), x['project']))
+
+    subject = f"Community Activity Alerts: {count} peak{'s' if count > 1 else ''} detected"
+
+    parts = [DIGEST_INTRO.substitute(count=count, peaks_have='peaks have' if count > 1 else 'peak has')]
+    for peak_type, title, unit in DIGEST_SECTIONS:
+        section = [p for p in sorted_peaks if p['peak_type'] == peak_type]
+        if not section:
+            continue
+        parts.append(DIGEST_SECTION.substitute(title=title, count=len(section)))
+        for i, peak in enumerate(section, 1):
+            timestamp = peak['timestamp']
+            parts.append(DIGEST_PEAK.substitute(
+                index=i,
+                project=peak['project'],
+                date=timestamp.strftime('%Y-%m-%d') if hasattr(timestamp, 'strftime') else str(timestamp),
+                unit=unit,
+                value=f"{peak['value']:,}",
+                increase=f"{peak['percentage_difference']:.1f}",
+                baseline=f"{peak['rolling_mean']:.0f}"
+            ))
+    parts.append(DIGEST_FOOTER)
+
+    return subject, ''.join(parts)
+
 class MediaWikiEmailService:
     def __init__(self):
         self.api_url = "https://meta.wikimedia.org/w/api.php"
@@ -143,13 +218,15 @@ This is an automated notification from the Community Activity Alerts tool.
         
         return self.send_email(username, subject, text)
     
-    def send_batched_peak_notifications(self, username, peaks):
+    def send_batched_peak_notifications(self, username, peaks, digest=None):
         """
         Send a single email with multiple peaks formatted as a table.
         
         Args:
             username: The username to notify
             peaks: List of peak dictionaries
+            digest: Optional (subject, body) from render_peak_digest(peaks),
+                reused when several users are sent the same peaks
             
         Returns:
             dict: Response with success status and message
@@ -157,54 +234,8 @@ This is an automated notification from the Community Activity Alerts tool.
         if not peaks:
             return {"success": False, "error": "No peaks provided"}
         
-        # Sort peaks by percentage difference (highest first)
-        sorted_peaks = sorted(peaks, key=lambda x: x.get('percentage_difference', 0), reverse=True)
-        
-        # Count peaks by type
-        edit_peaks = [p for p in sorted_peaks if p['peak_type'] == 'edit']
-        editor_peaks = [p for p in sorted_peaks if p['peak_type'] == 'editor']
-        
-        subject = f"Community Activity Alerts: {len(sorted_peaks)} peak{'s' if len(sorted_peaks) > 1 else ''} detected"
-        
-        # Build wiki-style table
-        text = f"""Hello {username},
-
-{len(sorted_peaks)} significant activity peak{'s have' if len(sorted_peaks) > 1 else ' has'} been detected in projects you are subscribed to:
-
-"""
-        
-        if edit_peaks:
-            text += f"\n━━━ Edit Count Peaks ({len(edit_peaks)}) ━━━\n\n"
-            
-            for i, peak in enumerate(edit_peaks, 1):
-                timestamp = peak['timestamp'].strftime('%Y-%m-%d') if hasattr(peak['timestamp'], 'strftime') else str(peak['timestamp'])
-                text += f"{i}. {peak['project']}\n"
-                text += f"   • Date: {timestamp}\n"
-                text += f"   • Edits: {peak['value']:,}\n"
-                text += f"   • Increase: +{peak['percentage_difference']:.1f}% (baseline: {peak['rolling_mean']:.0f})\n\n"
-        
-        if editor_peaks:
-            text += f"\n━━━ Editor Count Peaks ({len(editor_peaks)}) ━━━\n\n"
-            
-            for i, peak in enumerate(editor_peaks, 1):
-                timestamp = peak['timestamp'].strftime('%Y-%m-%d') if hasattr(peak['timestamp'], 'strftime') else str(peak['timestamp'])
-                text += f"{i}. {peak['project']}\n"
-                text += f"   • Date: {timestamp}\n"
-                text += f"   • Editors: {peak['value']:,}\n"
-                text += f"   • Increase: +{peak['percentage_difference']:.1f}% (baseline: {peak['rolling_mean']:.0f})\n\n"
-        
-        text += """
-
-These represent notable increases in community activity. You may want to investigate these spikes and consider adding annotations to help document what caused these increases.
-
-Visit the Community Activity Alerts dashboard to view more details and add annotations:
-https://community-activity-alerts.toolforge.org/
-
-To manage your notification preferences, visit your subscription settings in the dashboard.
-
----
-This is an automated notification from the Community Activity Alerts tool.
-"""
+        subject, body = digest or render_peak_digest(peaks)
+        text = DIGEST_GREETING.substitute(username=username) + body
         
         return self.send_email(username, subject, text)
     
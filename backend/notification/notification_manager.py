@@ -1,7 +1,11 @@
 import logging
 from datetime import datetime, timedelta, timezone
 from backend.config import get_db_connection
-from backend.notification.mediawiki_email_service import MediaWikiEmailService
+from backend.notification.mediawiki_email_service import (
+    MediaWikiEmailService,
+    peak_digest_key,
+    render_peak_digest,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -9,158 +13,235 @@ class NotificationManager:
     def __init__(self):
         self.email_service = MediaWikiEmailService()
     
-    def get_subscribed_users_for_peak(self, project, peak_type):
-        """Get users watching this project either directly or via language watch"""
+    def log_notifications(self, username, peaks, status, error_message=None):
+        """
+        Record the outcome of one email covering peaks with a multi-row upsert,
+        so a retry after a failure overwrites the earlier 'failed' row.
+        Returns False if the outcome could not be recorded.
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            # Extract language code from project (e.g., 'en' from 'en.wikipedia.org')
-            language_code = project.split('.')[0] if '.' in project else None
-            
-            # Get users watching this specific project
-            cursor.execute("""
-                SELECT DISTINCT username
-                FROM user_project_watchlist
-                WHERE project = %s 
-                AND is_active = TRUE
-                AND (notification_type = %s OR notification_type = 'both')
-            """, (project, peak_type))
-            
-            users = set(row[0] for row in cursor.fetchall())
-            
-            # Get users watching this language (if language code exists)
-            if language_code:
-                cursor.execute("""
-                    SELECT DISTINCT username
-                    FROM user_language_watchlist
-                    WHERE language_code = %s 
-                    AND is_active = TRUE
-                    AND (notification_type = %s OR notification_type = 'both')
-                """, (language_code, peak_type))
-                
-                language_users = set(row[0] for row in cursor.fetchall())
-                users.update(language_users)
+            cursor.executemany("""
+                INSERT INTO notification_logs
+                (username, project, peak_type, peak_timestamp, notification_status, error_message)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    notification_status = VALUES(notification_status),
+                    error_message = VALUES(error_message),
+                    notification_sent_at = CURRENT_TIMESTAMP
+            """, [
+                (username, peak['project'], peak['peak_type'], peak['timestamp'], status, error_message)
+                for peak in peaks
+            ])
             
-            return list(users)
+            conn.commit()
+            return True
             
         except Exception as e:
-            logger.error(f"Error fetching subscribed users for {project}: {e}")
-            return []
+            logger.error(f"Error logging notifications for {username}: {e}")
+            conn.rollback()
+            return False
         finally:
             cursor.close()
             conn.close()
     
-    def log_notification(self, username, project, peak_type, peak_timestamp, status, error_message=None):
+    # Name under which this job's position in peak_events is stored
+    FEED_CONSUMER = 'email_notifications'
+    
+    # Peaks to notify about: those added to the peak_events feed since the last
+    # run, except backfilled ones (see AlertWriter), plus peaks newer than the
+    # retry cutoff whose send failed. Stale peaks are no longer detected and are
+    # never notified.
+    # candidates are the (user, peak) pairs their watchers produce via a project
+    # watch or a watch on the project's language code.
+    CANDIDATES_SQL = """
+        WITH peaks AS (
+            SELECT a.project, a.timestamp, 'edit' AS peak_type, a.edit_count AS value,
+                   a.rolling_mean, a.threshold, a.percentage_difference
+            FROM peak_events e
+            JOIN community_alerts a ON a.project = e.project AND a.timestamp = e.timestamp
+            WHERE e.id > %(after)s AND e.id <= %(upto)s AND e.peak_type = 'edit'
+            AND e.is_backfill = FALSE AND a.is_stale = FALSE
+            UNION
+            SELECT a.project, a.timestamp, 'editor' AS peak_type, a.editor_count AS value,
+                   a.rolling_mean, a.threshold, a.percentage_difference
+            FROM peak_events e
+            JOIN editor_alerts a ON a.project = e.project AND a.timestamp = e.timestamp
+            WHERE e.id > %(after)s AND e.id <= %(upto)s AND e.peak_type = 'editor'
+            AND e.is_backfill = FALSE AND a.is_stale = FALSE
+            UNION
+            SELECT a.project, a.timestamp, 'edit' AS peak_type, a.edit_count AS value,
+                   a.rolling_mean, a.threshold, a.percentage_difference
+            FROM notification_logs n
+            JOIN community_alerts a ON a.project = n.project AND a.timestamp = n.peak_timestamp
+            WHERE n.notification_status = 'failed' AND n.peak_type = 'edit'
+            AND a.timestamp >= %(retry_cutoff)s AND a.is_stale = FALSE
+            UNION
+            SELECT a.project, a.timestamp, 'editor' AS peak_type, a.editor_count AS value,
+                   a.rolling_mean, a.threshold, a.percentage_difference
+            FROM notification_logs n
+            JOIN editor_alerts a ON a.project = n.project AND a.timestamp = n.peak_timestamp
+            WHERE n.notification_status = 'failed' AND n.peak_type = 'editor'
+            AND a.timestamp >= %(retry_cutoff)s AND a.is_stale = FALSE
+        ),
+        candidates AS (
+            SELECT w.username, p.*
+            FROM peaks p
+            JOIN user_project_watchlist w
+              ON w.project = p.project
+             AND w.is_active = TRUE
+             AND w.notification_type IN (p.peak_type, 'both')
+            UNION
+            SELECT w.username, p.*
+            FROM peaks p
+            JOIN user_language_watchlist w
+              ON w.language_code = SUBSTRING_INDEX(p.project, '.', 1)
+             AND w.is_active = TRUE
+             AND w.notification_type IN (p.peak_type, 'both')
+            WHERE p.project LIKE '%%.%%'
+        )
+    """
+    
+    # Correlated lookup served by idx_notification_lookup (project, peak_timestamp, peak_type, username)
+    SENT_EXISTS_SQL = """
+        EXISTS (
+            SELECT 1 FROM notification_logs n
+            WHERE n.project = c.project
+            AND n.peak_timestamp = c.timestamp
+            AND n.peak_type = c.peak_type
+            AND n.username = c.username
+            AND n.notification_status = 'sent'
+        )
+    """
+    
+    def get_feed_position(self):
+        """
+        Return (after, upto): the last peak_events id this job processed and
+        the newest id in the feed. Events in (after, upto] are unprocessed.
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute("""
-                INSERT INTO notification_logs
-                (username, project, peak_type, peak_timestamp, notification_status, error_message)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (username, project, peak_type, peak_timestamp, status, error_message))
+            cursor.execute(
+                "INSERT IGNORE INTO peak_event_offsets (consumer, last_event_id) VALUES (%s, 0)",
+                (self.FEED_CONSUMER,)
+            )
+            cursor.execute(
+                "SELECT last_event_id FROM peak_event_offsets WHERE consumer = %s",
+                (self.FEED_CONSUMER,)
+            )
+            after = cursor.fetchone()[0]
             
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM peak_events")
+            upto = cursor.fetchone()[0]
+            return after, max(after, upto)
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def advance_feed_position(self, upto):
+        """Mark every peak_events id up to upto as processed."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "UPDATE peak_event_offsets SET last_event_id = %s WHERE consumer = %s AND last_event_id < %s",
+                (upto, self.FEED_CONSUMER, upto)
+            )
             conn.commit()
-            
-        except Exception as e:
-            logger.error(f"Error logging notification: {e}")
-            conn.rollback()
         finally:
             cursor.close()
             conn.close()
     
-    def get_already_notified_set(self, days_back=31):
-            """Fetches all successfully sent notifications in the last X days to avoid redundant DB calls"""
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            notified_set = set()
-            
-            try:
-                cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
-                cursor.execute("""
-                    SELECT project, peak_timestamp, peak_type, username
-                    FROM notification_logs
-                    WHERE notification_status = 'sent'
-                    AND peak_timestamp >= %s
-                """, (cutoff_date,))
-                
-                for row in cursor.fetchall():
-                    # Store as a tuple key: (project, timestamp, type, username)
-                    notified_set.add((row[0], row[1], row[2], row[3]))
-                    
-                return notified_set
-            except Exception as e:
-                logger.error(f"Error fetching notified set: {e}")
-                return notified_set
-            finally:
-                cursor.close()
-                conn.close()
-
-    def get_new_peaks_from_alerts(self, days_back=31):
+    def get_pending_notifications(self, after, upto, days_back=92):
+        """
+        Return (user_peaks, total_peaks, total_skipped) for the peaks fed in
+        (after, upto] plus failed sends to retry for peaks up to days_back days
+        old. Deduplication against sent notifications happens in SQL
+        as an anti-join, so only (user, peak) pairs still to notify reach Python.
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
+            params = {
+                'after': after,
+                'upto': upto,
+                'retry_cutoff': datetime.now(timezone.utc) - timedelta(days=days_back)
+            }
             
-            cursor.execute("""
-                SELECT project, timestamp, edit_count as value, 
-                       rolling_mean, threshold, percentage_difference
-                FROM community_alerts
-                WHERE timestamp >= %s
-                ORDER BY timestamp DESC
-            """, (cutoff_date,))
+            cursor.execute(self.CANDIDATES_SQL + "SELECT COUNT(*) FROM peaks", params)
+            total_peaks = cursor.fetchone()[0] or 0
             
-            edit_peaks = []
-            for row in cursor.fetchall():
-                edit_peaks.append({
-                    'project': row[0],
-                    'timestamp': row[1],
-                    'peak_type': 'edit',
-                    'value': row[2],
-                    'rolling_mean': row[3],
-                    'threshold': row[4],
-                    'percentage_difference': row[5]
-                })
+            if not total_peaks:
+                return {}, 0, 0
+            
+            cursor.execute(
+                self.CANDIDATES_SQL + f"SELECT COUNT(*) FROM candidates c WHERE {self.SENT_EXISTS_SQL}",
+                params
+            )
+            total_skipped = cursor.fetchone()[0] or 0
             
-            cursor.execute("""
-                SELECT project, timestamp, editor_count as value,
-                       rolling_mean, threshold, percentage_difference
-                FROM editor_alerts
-                WHERE timestamp >= %s
-                ORDER BY timestamp DESC
-            """, (cutoff_date,))
+            cursor.execute(
+                self.CANDIDATES_SQL + f"""
+                    SELECT c.username, c.project, c.timestamp, c.peak_type, c.value,
+                           c.rolling_mean, c.threshold, c.percentage_difference
+                    FROM candidates c
+                    WHERE NOT {self.SENT_EXISTS_SQL}
+                    ORDER BY c.username
+                """,
+                params
+            )
             
-            editor_peaks = []
+            user_peaks = {}
             for row in cursor.fetchall():
-                editor_peaks.append({
-                    'project': row[0],
-                    'timestamp': row[1],
-                    'peak_type': 'editor',
-                    'value': row[2],
-                    'rolling_mean': row[3],
-                    'threshold': row[4],
-                    'percentage_difference': row[5]
+                user_peaks.setdefault(row[0], []).append({
+                    'project': row[1],
+                    'timestamp': row[2],
+                    'peak_type': row[3],
+                    'value': row[4],
+                    'rolling_mean': row[5],
+                    'threshold': row[6],
+                    'percentage_difference': row[7]
                 })
             
-            logger.info(f"Found {len(edit_peaks)} edit peaks and {len(editor_peaks)} editor peaks from last {days_back} days")
-            return edit_peaks + editor_peaks
+            logger.info(f"Found {total_peaks} new or retried peaks (events {after}..{upto}); {total_skipped} notifications already sent")
+            return user_peaks, total_peaks, total_skipped
             
-        except Exception as e:
-            logger.error(f"Error fetching peaks from alert tables: {e}")
-            return []
         finally:
             cursor.close()
             conn.close()
     
-    def process_notifications(self, days_back=31):
-        logger.info(f"Starting notification processing for peaks from last {days_back} days")
+    def process_notifications(self, days_back=92):
+        """
+        Notify watchers about the peaks added to the peak_events feed since the
+        last run, and retry failed sends for peaks up to days_back days old.
+        The feed position only advances once every email was attempted and its
+        outcome recorded, so an interrupted run is resumed by the next one, and
+        the sent anti-join keeps reruns from emailing anyone twice.
+        """
+        logger.info(f"Starting notification processing for new peaks (retrying failures up to {days_back} days old)")
         
-        peaks = self.get_new_peaks_from_alerts(days_back)
+        try:
+            after, upto = self.get_feed_position()
+            user_peaks, total_peaks, total_skipped = self.get_pending_notifications(after, upto, days_back)
+        except Exception as e:
+            logger.error(f"Error fetching pending notifications: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "total_peaks": 0,
+                "total_sent": 0,
+                "total_failed": 0,
+                "total_skipped": 0
+            }
         
-        if not peaks:
+        if not total_peaks:
+            self.advance_feed_position(upto)
             logger.info("No peaks found to notify")
             return {
                 "success": True,
@@ -170,43 +251,29 @@ class NotificationManager:
                 "total_skipped": 0
             }
         
-        # Optimization: Fetch all 'sent' logs once
-        already_notified = self.get_already_notified_set(days_back)
-        
-        logger.info(f"Processing {len(peaks)} peaks")
-        
-        # Group peaks by user
-        user_peaks = {}
-        total_skipped = 0
-        for peak in peaks:
-            subscribed_users = self.get_subscribed_users_for_peak(peak['project'], peak['peak_type'])
-            
-            # Instead of checking each notification individually, we check if the user has already been notified for this peak using the in-memory set
-            for username in subscribed_users:
-                # Check against the in-memory set instead of the database
-                notification_key = (peak['project'], peak['timestamp'], peak['peak_type'], username)
-                
-                if notification_key in already_notified:
-                    total_skipped += 1
-                    continue
-                
-                if username not in user_peaks:
-                    user_peaks[username] = []
-                user_peaks[username].append(peak)
-        
         if not user_peaks:
+            self.advance_feed_position(upto)
             logger.info("No users to notify")
             return {
                 "success": True,
-                "total_peaks": len(peaks),
+                "total_peaks": total_peaks,
                 "total_sent": 0,
                 "total_failed": 0,
                 "total_skipped": total_skipped
             }
         
+        # Users watching the same peaks (e.g. the same language) share one rendered digest
+        digest_keys = {username: peak_digest_key(peaks) for username, peaks in user_peaks.items()}
+        digests = {}
+        for username, key in digest_keys.items():
+            if key not in digests:
+                digests[key] = render_peak_digest(user_peaks[username])
+        logger.info(f"Rendered {len(digests)} distinct digests for {len(user_peaks)} users")
+        
         # Send batched notifications to each user
         total_sent = 0
         total_failed = 0
+        all_logged = True
         
         for username, user_peak_list in user_peaks.items():
             logger.info(f"Sending notification to {username} for {len(user_peak_list)} peaks")
@@ -214,46 +281,38 @@ class NotificationManager:
             try:
                 result = self.email_service.send_batched_peak_notifications(
                     username=username,
-                    peaks=user_peak_list
+                    peaks=user_peak_list,
+                    digest=digests[digest_keys[username]]
                 )
                 
                 if result.get('success'):
-                    # Log each peak notification as sent
-                    for peak in user_peak_list:
-                        self.log_notification(
-                            username,
-                            peak['project'],
-                            peak['peak_type'], 
-                            peak['timestamp'],
-                            'sent'
-                        )
+                    all_logged &= self.log_notifications(username, user_peak_list, 'sent')
                     total_sent += 1
                     logger.info(f"Successfully sent notification to {username}")
                 else:
                     error_msg = result.get('error', 'Unknown error')
-                    # Log each peak notification as failed
-                    for peak in user_peak_list:
-                        self.log_notification(
-                            username, peak['project'], peak['peak_type'],
-                            peak['timestamp'], 'failed', error_msg
-                        )
+                    all_logged &= self.log_notifications(username, user_peak_list, 'failed', error_msg)
                     total_failed += 1
                     logger.error(f"Failed to send notification to {username}: {error_msg}")
                     
             except Exception as e:
                 logger.error(f"Error sending notification to {username}: {e}")
-                for peak in user_peak_list:
-                    self.log_notification(
-                        username, peak['project'], peak['peak_type'],
-                        peak['timestamp'], 'failed', str(e)
-                    )
+                all_logged &= self.log_notifications(username, user_peak_list, 'failed', str(e))
                 total_failed += 1
         
+        # Failed sends are retried through notification_logs, not the feed. An
+        # outcome that could not be logged would be lost, so keep the events
+        # for the next run (the sent anti-join skips whoever did get the email).
+        if all_logged:
+            self.advance_feed_position(upto)
+        else:
+            logger.warning(f"Some notification outcomes were not logged; keeping feed position at {after}")
+        
         logger.info(f"Notification processing complete. Users notified: {total_sent}, Failed: {total_failed}")
         
         return {
             "success": True,
-            "total_peaks": len(peaks),
+            "total_peaks": total_peaks,
             "total_sent": total_sent,
             "total_failed": total_failed,
             "total_skipped": total_skipped
@@ -1,15 +1,184 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from config import get_db_connection
+import io
+import csv
+import json
 import logging
 from subscription.sitematrix_validator import (
     is_valid_project,
     is_valid_language,
     normalize_project,
-    normalize_language_code
+    normalize_language_code,
+    partition_projects,
+    partition_languages
 )
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATION_TYPES = ('edit', 'editor', 'both')
+BULK_WATCHLIST_MAX_ITEMS = 1000
+
+# request key -> (table, value column, CSV type, normalizer, SiteMatrix partitioner)
+WATCHLIST_KINDS = {
+    'projects': ('user_project_watchlist', 'project', 'project', normalize_project, partition_projects),
+    'languages': ('user_language_watchlist', 'language_code', 'language', normalize_language_code, partition_languages),
+}
+
+CSV_FIELDS = ['type', 'value', 'notification_type']
+
+
+def _in_placeholders(count):
+    return ", ".join(["%s"] * count)
+
+
+def _collect_entries(data, default_type):
+    """
+    Read {"projects": [...], "languages": [...]} where each item is either a
+    string or an object with "project" / "language_code" and an optional
+    "notification_type". Returns ({kind: {normalized value: notification_type}}, errors).
+    """
+    entries = {}
+    errors = []
+    for kind, (_, column, _, normalize, _) in WATCHLIST_KINDS.items():
+        items = data.get(kind) or []
+        if not isinstance(items, list):
+            errors.append({"kind": kind, "error": "Expected a list"})
+            continue
+
+        parsed = {}
+        for item in items:
+            if isinstance(item, dict):
+                value = item.get(column)
+                notification_type = item.get('notification_type') or default_type
+            else:
+                value = item
+                notification_type = default_type
+
+            normalized = normalize(value) if isinstance(value, str) else None
+            if not normalized:
+                errors.append({"kind": kind, "value": value, "error": "Missing value"})
+            elif notification_type not in NOTIFICATION_TYPES:
+                errors.append({"kind": kind, "value": value, "error": "Invalid notification type"})
+            else:
+                parsed[normalized] = notification_type
+        entries[kind] = parsed
+    return entries, errors
+
+
+def _count_items(data):
+    return sum(len(data.get(kind) or []) for kind in WATCHLIST_KINDS if isinstance(data.get(kind), list))
+
+
+def _add_entries(user, entries):
+    """
+    Validate entries against SiteMatrix in one pass per kind and upsert the
+    valid ones with multi-row inserts in a single transaction.
+    Returns ({kind: added count}, {kind: [invalid values]}).
+    """
+    rows = {}
+    invalid = {}
+    for kind, values in entries.items():
+        partition = WATCHLIST_KINDS[kind][4]
+        valid, invalid[kind] = partition(list(values))
+        rows[kind] = [(user, value, values[value]) for value in valid]
+
+    if not any(rows.values()):
+        return {kind: 0 for kind in entries}, invalid
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        conn.begin()
+        for kind, kind_rows in rows.items():
+            if not kind_rows:
+                continue
+            table, column = WATCHLIST_KINDS[kind][:2]
+            # pymysql turns this into multi-row INSERT statements
+            cursor.executemany(f"""
+                INSERT INTO {table} (username, {column}, notification_type, is_active)
+                VALUES (%s, %s, %s, TRUE)
+                ON DUPLICATE KEY UPDATE 
+                    notification_type = VALUES(notification_type),
+                    is_active = TRUE,
+                    updated_at = CURRENT_TIMESTAMP
+            """, kind_rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return {kind: len(kind_rows) for kind, kind_rows in rows.items()}, invalid
+
+
+def _read_import_payload():
+    """
+    Return the watchlist payload of an import request as a dict shaped like the
+    JSON export. Accepts a JSON body, a text/csv body, or an uploaded "file"
+    (CSV when its name ends in .csv, JSON otherwise). Raises ValueError.
+    """
+    if 'file' in request.files:
+        upload = request.files['file']
+        text = upload.read().decode('utf-8-sig')
+        is_csv = (upload.filename or '').lower().endswith('.csv')
+    elif request.mimetype == 'text/csv':
+        text = request.get_data(as_text=True)
+        is_csv = True
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("Invalid JSON body")
+        return data
+
+    if not is_csv:
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError("Invalid JSON file")
+        return data
+
+    csv_types = {csv_type: (kind, column) for kind, (_, column, csv_type, _, _) in WATCHLIST_KINDS.items()}
+    data = {kind: [] for kind in WATCHLIST_KINDS}
+    for row in csv.DictReader(io.StringIO(text)):
+        row_type = (row.get('type') or '').strip().lower()
+        if row_type not in csv_types:
+            raise ValueError(f"Unknown row type: '{row.get('type')}'")
+        kind, column = csv_types[row_type]
+        data[kind].append({
+            column: row.get('value'),
+            "notification_type": (row.get('notification_type') or '').strip() or None
+        })
+    return data
+
+
+def _bulk_add_response(user, data):
+    """Shared body of /bulk-add and /import."""
+    if _count_items(data) > BULK_WATCHLIST_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_WATCHLIST_MAX_ITEMS} items per request"}), 400
+
+    default_type = data.get('notification_type', 'both')
+    if default_type not in NOTIFICATION_TYPES:
+        return jsonify({"error": "Invalid notification type"}), 400
+
+    entries, errors = _collect_entries(data, default_type)
+    if not any(entries.values()):
+        return jsonify({"error": "No projects or languages given", "errors": errors}), 400
+
+    try:
+        added, invalid = _add_entries(user, entries)
+    except Exception as e:
+        logger.error(f"Error bulk adding watchlist entries for user {user}: {e}")
+        return jsonify({"error": "Failed to add watchlist entries"}), 500
+
+    return jsonify({
+        "success": True,
+        "added": added,
+        "invalid": invalid,
+        "errors": errors
+    }), 200
+
+
 def create_watchlist_blueprint(mwo_auth):
     watchlist_bp = Blueprint('watchlist', __name__)
 
@@ -374,4 +543,144 @@ def create_watchlist_blueprint(mwo_auth):
             cursor.close()
             conn.close()
 
+    # Bulk watchlist endpoints
+    @watchlist_bp.route('/bulk-add', methods=['POST'])
+    def bulk_add_to_watchlist():
+        """
+        Add many projects and languages at once.
+        Body: {"projects": [...], "languages": [...], "notification_type": "both"}
+        """
+        user = mwo_auth.get_current_user(True)
+        if not user:
+            return jsonify({"error": "Authentication required"}), 401
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON body"}), 400
+
+        return _bulk_add_response(user, data)
+
+    @watchlist_bp.route('/bulk-remove', methods=['POST'])
+    def bulk_remove_from_watchlist():
+        """
+        Deactivate many projects and languages at once.
+        Body: {"projects": [...], "languages": [...]}
+        """
+        user = mwo_auth.get_current_user(True)
+        if not user:
+            return jsonify({"error": "Authentication required"}), 401
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON body"}), 400
+        if _count_items(data) > BULK_WATCHLIST_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_WATCHLIST_MAX_ITEMS} items per request"}), 400
+
+        entries, errors = _collect_entries(data, 'both')
+        if not any(entries.values()):
+            return jsonify({"error": "No projects or languages given", "errors": errors}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            removed = {}
+            conn.begin()
+            for kind, values in entries.items():
+                removed[kind] = 0
+                if not values:
+                    continue
+                table, column = WATCHLIST_KINDS[kind][:2]
+                cursor.execute(f"""
+                    UPDATE {table}
+                    SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
+                    WHERE username = %s AND {column} IN ({_in_placeholders(len(values))})
+                    AND is_active = TRUE
+                """, [user] + list(values))
+                removed[kind] = cursor.rowcount
+            conn.commit()
+
+            return jsonify({
+                "success": True,
+                "removed": removed,
+                "errors": errors
+            }), 200
+
+        except Exception as e:
+            logger.error(f"Error bulk removing watchlist entries for user {user}: {e}")
+            conn.rollback()
+            return jsonify({"error": "Failed to remove watchlist entries"}), 500
+        finally:
+            cursor.close()
+            conn.close()
+
+    @watchlist_bp.route('/export', methods=['GET'])
+    def export_watchlist():
+        """Export the active project and language watchlist as JSON (default) or CSV (?format=csv)."""
+        user = mwo_auth.get_current_user(True)
+        if not user:
+            return jsonify({"error": "Authentication required"}), 401
+
+        export_format = request.args.get('format', 'json')
+        if export_format not in ('json', 'csv'):
+            return jsonify({"error": "Invalid format"}), 400
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            exported = {}
+            for kind, (table, column, _, _, _) in WATCHLIST_KINDS.items():
+                cursor.execute(f"""
+                    SELECT {column}, notification_type
+                    FROM {table}
+                    WHERE username = %s AND is_active = TRUE
+                    ORDER BY {column}
+                """, (user,))
+                exported[kind] = [
+                    {column: row[0], "notification_type": row[1]}
+                    for row in cursor.fetchall()
+                ]
+        except Exception as e:
+            logger.error(f"Error exporting watchlist for user {user}: {e}")
+            return jsonify({"error": "Failed to export watchlist"}), 500
+        finally:
+            cursor.close()
+            conn.close()
+
+        if export_format == 'json':
+            response = jsonify(exported)
+            response.headers['Content-Disposition'] = 'attachment; filename=watchlist.json'
+            return response
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(CSV_FIELDS)
+        for kind, (_, column, csv_type, _, _) in WATCHLIST_KINDS.items():
+            for entry in exported[kind]:
+                writer.writerow([csv_type, entry[column], entry["notification_type"]])
+
+        return Response(
+            output.getvalue(),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=watchlist.csv'}
+        )
+
+    @watchlist_bp.route('/import', methods=['POST'])
+    def import_watchlist():
+        """
+        Import a watchlist exported by /export (JSON body, text/csv body or an
+        uploaded "file"). Entries are merged into the existing watchlist.
+        """
+        user = mwo_auth.get_current_user(True)
+        if not user:
+            return jsonify({"error": "Authentication required"}), 401
+
+        try:
+            data = _read_import_payload()
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({"error": f"Invalid import file: {e}"}), 400
+
+        return _bulk_add_response(user, data)
+
     return watchlist_bp
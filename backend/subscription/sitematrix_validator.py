@@ -1,7 +1,10 @@
-import requests
+import os
+import json
 import logging
+import tempfile
+import threading
 import time
-from utils import getHeader
+from http_client import get_json
 
 logger = logging.getLogger(__name__)
 
@@ -12,42 +15,35 @@ _SITEMATRIX_CACHE = {
 }
 
 CACHE_TTL_SECONDS = 3600
+# After a failed refresh the previous snapshot is served this long before retrying
+REFRESH_RETRY_SECONDS = 60
+
+# Last good SiteMatrix, shared by all workers so cold processes start warm
+SNAPSHOT_PATH = os.getenv(
+    "SITEMATRIX_SNAPSHOT_PATH",
+    os.path.join(tempfile.gettempdir(), "sitematrix_snapshot.json")
+)
+
+# Held by whichever thread is fetching; non-blocking acquires dedupe refreshes
+_refresh_lock = threading.Lock()
+
 
 def _fetch_sitematrix():
-    """Fetch SiteMatrix data from Wikimedia API and populate cache."""
-    try:
-        sitematrix_url = "https://meta.wikimedia.org/w/api.php?action=sitematrix&format=json"
-        response = requests.get(sitematrix_url, headers=getHeader(), timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        projects = set()
-        languages = set()
-        sitematrix = data.get("sitematrix", {})
+    """Fetch SiteMatrix data from Wikimedia API. Returns (projects, languages); raises on failure."""
+    sitematrix_url = "https://meta.wikimedia.org/w/api.php?action=sitematrix&format=json"
+    data = get_json(sitematrix_url, timeout=(3.05, 30))
+    
+    projects = set()
+    languages = set()
+    sitematrix = data.get("sitematrix", {})
+    
+    for key, val in sitematrix.items():
+        if key == "count":
+            continue
         
-        for key, val in sitematrix.items():
-            if key == "count":
-                continue
-            
-            if key == "specials":
-                if isinstance(val, list):
-                    for site in val:
-                        if site.get("closed"):
-                            continue
-                        site_url = site.get("url")
-                        if site_url:
-                            normalized_url = normalize_project(site_url)
-                            if normalized_url:
-                                projects.add(normalized_url)
-                continue
-            
-            if isinstance(val, dict):
-                lang_code = val.get("code")
-                if lang_code:
-                    languages.add(lang_code.lower())
-                
-                sites = val.get("site", [])
-                for site in sites:
+        if key == "specials":
+            if isinstance(val, list):
+                for site in val:
                     if site.get("closed"):
                         continue
                     site_url = site.get("url")
@@ -55,24 +51,130 @@ def _fetch_sitematrix():
                         normalized_url = normalize_project(site_url)
                         if normalized_url:
                             projects.add(normalized_url)
+            continue
         
-        _SITEMATRIX_CACHE["projects"] = projects
-        _SITEMATRIX_CACHE["languages"] = languages
-        _SITEMATRIX_CACHE["expires_at"] = time.time() + CACHE_TTL_SECONDS
-        
-        logger.info(f"SiteMatrix cache updated: {len(projects)} projects, {len(languages)} languages")
-        return True
-        
+        if isinstance(val, dict):
+            lang_code = val.get("code")
+            if lang_code:
+                languages.add(lang_code.lower())
+            
+            sites = val.get("site", [])
+            for site in sites:
+                if site.get("closed"):
+                    continue
+                site_url = site.get("url")
+                if site_url:
+                    normalized_url = normalize_project(site_url)
+                    if normalized_url:
+                        projects.add(normalized_url)
+    
+    return projects, languages
+
+
+def _install_snapshot(projects, languages, fetched_at):
+    _SITEMATRIX_CACHE["projects"] = projects
+    _SITEMATRIX_CACHE["languages"] = languages
+    _SITEMATRIX_CACHE["expires_at"] = fetched_at + CACHE_TTL_SECONDS
+
+
+def _save_snapshot(projects, languages, fetched_at):
+    """Write the snapshot atomically so other workers never read a partial file."""
+    try:
+        tmp_path = f"{SNAPSHOT_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "fetched_at": fetched_at,
+                "projects": sorted(projects),
+                "languages": sorted(languages),
+            }, f)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+    except OSError as e:
+        logger.warning(f"Could not save SiteMatrix snapshot to {SNAPSHOT_PATH}: {e}")
+
+
+def _load_snapshot():
+    """Install the on-disk snapshot if there is one. Returns True when loaded."""
+    try:
+        with open(SNAPSHOT_PATH) as f:
+            snapshot = json.load(f)
+        projects = set(snapshot["projects"])
+        languages = set(snapshot["languages"])
+        fetched_at = float(snapshot["fetched_at"])
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable SiteMatrix snapshot {SNAPSHOT_PATH}: {e}")
+        return False
+
+    if not projects:
+        return False
+    _install_snapshot(projects, languages, fetched_at)
+    logger.info(f"SiteMatrix loaded from snapshot: {len(projects)} projects, {len(languages)} languages")
+    return True
+
+
+def refresh_sitematrix():
+    """Fetch SiteMatrix, install it and persist it. Returns True on success."""
+    try:
+        projects, languages = _fetch_sitematrix()
     except Exception as e:
         logger.error(f"Failed to fetch SiteMatrix: {e}")
+        if _SITEMATRIX_CACHE["projects"]:
+            # Keep serving the previous snapshot, retry later
+            _SITEMATRIX_CACHE["expires_at"] = time.time() + REFRESH_RETRY_SECONDS
         return False
 
+    fetched_at = time.time()
+    _install_snapshot(projects, languages, fetched_at)
+    _save_snapshot(projects, languages, fetched_at)
+    logger.info(f"SiteMatrix cache updated: {len(projects)} projects, {len(languages)} languages")
+    return True
+
+
+def _refresh_in_background():
+    if not _refresh_lock.acquire(blocking=False):
+        return  # a refresh is already running
+
+    def run():
+        try:
+            # Another worker may have refreshed the shared snapshot already
+            if not (_load_snapshot() and time.time() < _SITEMATRIX_CACHE["expires_at"]):
+                refresh_sitematrix()
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="sitematrix-refresh", daemon=True).start()
+
 
 def _ensure_cache():
-    """Ensure cache is populated and fresh."""
-    if time.time() > _SITEMATRIX_CACHE["expires_at"]:
-        return _fetch_sitematrix()
-    return True
+    """
+    Ensure a SiteMatrix snapshot is available.
+
+    A stale snapshot is served while a single background thread refreshes it.
+    Only a process with neither an in-memory nor an on-disk snapshot fetches
+    inline, and concurrent callers then wait for that one fetch.
+    """
+    if _SITEMATRIX_CACHE["projects"] or _load_snapshot():
+        if time.time() > _SITEMATRIX_CACHE["expires_at"]:
+            _refresh_in_background()
+        return True
+
+    with _refresh_lock:
+        if _SITEMATRIX_CACHE["projects"]:
+            return True
+        return refresh_sitematrix()
+
+
+def warm_sitematrix_cache():
+    """
+    Load SiteMatrix before serving requests: from the snapshot when it is
+    fresh, otherwise with an inline fetch. Never starts a background thread,
+    so it is safe to call in a gunicorn master before forking workers.
+    """
+    if (_SITEMATRIX_CACHE["projects"] or _load_snapshot()) and time.time() <= _SITEMATRIX_CACHE["expires_at"]:
+        return True
+    with _refresh_lock:
+        return refresh_sitematrix() or bool(_SITEMATRIX_CACHE["projects"])
 
 
 def normalize_project(project):
@@ -122,6 +224,36 @@ def is_valid_language(language_code):
     return normalized in _SITEMATRIX_CACHE["languages"]
 
 
+def partition_projects(projects):
+    """
+    Split already-normalized project domains into (valid, invalid) lists
+    against the SiteMatrix set, checking the cache once for the whole batch.
+    """
+    if not _ensure_cache():
+        logger.warning("SiteMatrix cache unavailable, allowing projects (fail-open)")
+        return list(projects), []
+
+    known = _SITEMATRIX_CACHE["projects"]
+    valid = [project for project in projects if project in known]
+    invalid = [project for project in projects if project not in known]
+    return valid, invalid
+
+
+def partition_languages(language_codes):
+    """
+    Split already-normalized language codes into (valid, invalid) lists
+    against the SiteMatrix set, checking the cache once for the whole batch.
+    """
+    if not _ensure_cache():
+        logger.warning("SiteMatrix cache unavailable, allowing languages (fail-open)")
+        return list(language_codes), []
+
+    known = _SITEMATRIX_CACHE["languages"]
+    valid = [code for code in language_codes if code in known]
+    invalid = [code for code in language_codes if code not in known]
+    return valid, invalid
+
+
 def get_cached_projects():
     """Get list of valid projects (for debugging/admin endpoints)."""
     _ensure_cache()
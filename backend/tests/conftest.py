@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app and its packages import each other relative to backend/ (e.g. "from config import ...")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("flask_cors")
+pytest.importorskip("flask_mwoauth")
+
+from app import parse_downsampling_args
+
+
+def test_defaults():
+    assert parse_downsampling_args({}) == ("month", None)
+
+
+def test_max_points_parsed():
+    assert parse_downsampling_args({"granularity": "year", "max_points": "12"}) == ("year", 12)
+
+
+def test_invalid_granularity():
+    with pytest.raises(ValueError, match="^Invalid granularity$"):
+        parse_downsampling_args({"granularity": "week"})
+
+
+def test_max_points_must_be_positive():
+    with pytest.raises(ValueError, match="^max_points must be positive$"):
+        parse_downsampling_args({"max_points": "0"})
+
+
+def test_non_numeric_max_points():
+    with pytest.raises(ValueError, match="^Invalid max_points$"):
+        parse_downsampling_args({"max_points": "abc"})
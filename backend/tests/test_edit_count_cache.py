@@ -0,0 +1,57 @@
+from unittest import mock
+
+import pytest
+
+from annotation import edit_count_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    edit_count_cache._EDIT_COUNT_CACHE.clear()
+    with mock.patch.object(edit_count_cache, "store_edit_counts"), \
+            mock.patch.object(edit_count_cache, "_load_from_db", return_value=None):
+        yield
+    edit_count_cache._EDIT_COUNT_CACHE.clear()
+
+
+def expire(username):
+    edit_count, _ = edit_count_cache._EDIT_COUNT_CACHE[username]
+    edit_count_cache._EDIT_COUNT_CACHE[username] = (edit_count, 0)
+
+
+def test_below_threshold_count_uses_short_ttl():
+    assert edit_count_cache._ttl_for(999) == edit_count_cache.BELOW_THRESHOLD_TTL_SECONDS
+    assert edit_count_cache._ttl_for(1000) == edit_count_cache.POSITIVE_TTL_SECONDS
+
+
+def test_user_near_threshold_is_rechecked():
+    with mock.patch.object(edit_count_cache, "fetch_global_edit_count", side_effect=[998, 1003]) as fetch:
+        assert edit_count_cache.get_cached_edit_count("Alice") == 998
+        expire("Alice")
+
+        assert edit_count_cache.get_cached_edit_count("Alice") == 1003
+        assert fetch.call_count == 2
+
+
+def test_stale_below_threshold_count_from_db_is_refetched():
+    with mock.patch.object(edit_count_cache, "_load_from_db", return_value=(998, 3600)), \
+            mock.patch.object(edit_count_cache, "fetch_global_edit_count", return_value=1003):
+        assert edit_count_cache.get_cached_edit_count("Alice") == 1003
+
+
+def test_stale_count_kept_when_refetch_fails():
+    with mock.patch.object(edit_count_cache, "fetch_global_edit_count", side_effect=[998, RuntimeError("down")]):
+        edit_count_cache.get_cached_edit_count("Alice")
+        expire("Alice")
+
+        assert edit_count_cache.get_cached_edit_count("Alice") == 998
+
+
+def test_eligible_count_is_refreshed_in_background():
+    with mock.patch.object(edit_count_cache, "fetch_global_edit_count", return_value=5000), \
+            mock.patch.object(edit_count_cache, "_refresh_in_background") as refresh:
+        edit_count_cache.get_cached_edit_count("Bob")
+        expire("Bob")
+
+        assert edit_count_cache.get_cached_edit_count("Bob") == 5000
+        refresh.assert_called_once_with("Bob")
@@ -0,0 +1,74 @@
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from backend.alerts.alert_writer import AlertWriter, is_backfill_peak
+from backend.notification.notification_manager import NotificationManager
+
+
+@pytest.mark.parametrize("peak, recorded_at", [
+    # Monthly run on the 1st, right after a 31-day month
+    (datetime(2024, 8, 1), datetime(2024, 9, 1, 0, 5)),
+    # ...after a 30-day month, with the cron delayed by a few days
+    (datetime(2024, 9, 1), datetime(2024, 10, 4, 12, 0)),
+    # ...after February
+    (datetime(2024, 2, 1), datetime(2024, 3, 1, 3, 0)),
+])
+def test_peak_from_last_month_is_not_backfill(peak, recorded_at):
+    assert not is_backfill_peak(peak, recorded_at)
+
+
+def test_historical_peak_is_backfill():
+    assert is_backfill_peak(datetime(2022, 5, 1), datetime(2024, 9, 1))
+
+
+def test_append_events_flags_backfill():
+    cursor = mock.Mock()
+    writer = AlertWriter(mock.Mock(), "community_alerts", "edit_count", "edit")
+
+    writer.append_events(cursor, [
+        ("en.wikipedia.org", datetime(2024, 8, 1), "edit"),
+        ("en.wikipedia.org", datetime(2021, 8, 1), "edit"),
+    ], recorded_at=datetime(2024, 9, 1, 0, 5))
+
+    rows = cursor.executemany.call_args[0][1]
+    assert [row[3] for row in rows] == [False, True]
+
+
+def make_manager(log_ok=True):
+    manager = NotificationManager.__new__(NotificationManager)
+    manager.email_service = mock.Mock()
+    manager.email_service.send_batched_peak_notifications.return_value = {"success": True}
+    manager.get_feed_position = mock.Mock(return_value=(10, 12))
+    manager.get_pending_notifications = mock.Mock(return_value=({
+        "alice": [{
+            "project": "en.wikipedia.org",
+            "timestamp": datetime(2024, 8, 1),
+            "peak_type": "edit",
+            "value": 1200,
+            "rolling_mean": 800.0,
+            "threshold": 1000.0,
+            "percentage_difference": 50.0,
+        }],
+    }, 1, 0))
+    manager.log_notifications = mock.Mock(return_value=log_ok)
+    manager.advance_feed_position = mock.Mock()
+    return manager
+
+
+def test_feed_position_advances_after_notifying():
+    manager = make_manager()
+
+    result = manager.process_notifications()
+
+    assert result["total_sent"] == 1
+    manager.advance_feed_position.assert_called_once_with(12)
+
+
+def test_feed_position_kept_when_outcome_not_logged():
+    manager = make_manager(log_ok=False)
+
+    manager.process_notifications()
+
+    manager.advance_feed_position.assert_not_called()
@@ -29,8 +29,13 @@ def main():
     try:
         notification_manager = NotificationManager()
         
-        # Check for detected peaks in the last month and send notifications
-        result = notification_manager.process_notifications(days_back=31)
+        # Notify about peaks added to the peak_events feed since the last run
+        # and retry failed sends for peaks from the last three months
+        result = notification_manager.process_notifications(days_back=92)
+        
+        if not result.get('success'):
+            logger.error(f"Notification job failed: {result.get('error')}")
+            return 1
         
         logger.info("Job completed successfully")
         logger.info(f"Total peaks processed: {result['total_peaks']}")
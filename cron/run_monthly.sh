@@ -24,4 +24,7 @@ $HOME/www/python/venv/bin/python3 backend/alerts/editor_alerts.py
 # 5. Monthly Peak Detection and Notification
 $HOME/www/python/venv/bin/python3 cron/monthly_peak_detection.py >> cron/notification.log 2>&1
 
+# 6. Refresh cached edit counts of watchlist users and annotators
+$HOME/www/python/venv/bin/python3 backend/annotation/prewarm_edit_counts.py
+
 echo "--- Finished Monthly Run: $(date) ---"
\ No newline at end of file
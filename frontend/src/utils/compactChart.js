@@ -0,0 +1,57 @@
+// Decoders for the compact chart payload (`format=compact` on the chart endpoints).
+// The backend sends a start month, a step in months and delta-encoded values;
+// trace styling lives here and in ActivityChart instead of in every response.
+
+const addMonths = (start, months) => {
+  const [year, month] = start.split('-').map(Number)
+  return new Date(Date.UTC(year, month - 1 + months, 1)).toISOString().slice(0, 10)
+}
+
+export const decodeAxis = ({ start, step }, length) =>
+  Array.from({ length }, (_, i) => addMonths(start, i * step))
+
+export const decodeDeltas = (deltas) => {
+  let value = 0
+  return deltas.map(delta => (value += delta))
+}
+
+// Columnar { key: [values] } -> [{ key: value }]
+const decodeRows = (columns) => {
+  const keys = Object.keys(columns)
+  const count = keys.length ? columns[keys[0]].length : 0
+  return Array.from({ length: count }, (_, i) =>
+    Object.fromEntries(keys.map(key => [key, columns[key][i]]))
+  )
+}
+
+// Single-project payload -> { peaks, chartData: { lineTrace, peaksTrace } }
+export const decodeCompactActivity = (data) => {
+  if (!data.series) {
+    return { peaks: [], chartData: {} }
+  }
+
+  const y = decodeDeltas(data.series.deltas)
+  const x = decodeAxis(data.series, y.length)
+  const markers = data.peakMarkers.index
+
+  return {
+    peaks: decodeRows(data.peaks),
+    chartData: {
+      lineTrace: {
+        x,
+        y,
+        type: 'scatter',
+        mode: 'lines',
+        connectgaps: false
+      },
+      peaksTrace: {
+        x: markers.map(i => x[i]),
+        y: markers.map(i => y[i]),
+        type: 'scatter',
+        mode: 'markers+text',
+        text: data.peakMarkers.text,
+        textposition: 'top center'
+      }
+    }
+  }
+}